@@ -6,22 +6,77 @@ This module provides the main ChatAgent class that handles all OpenAI GPT model
 with unified functionality.
 """
 
-import json
-import yaml
+import os
+import hashlib
 import time
+import random
+import asyncio
+import logging
+import importlib.util
 import requests
 from pathlib import Path
+from types import SimpleNamespace
 from datetime import datetime
-from dataclasses import asdict
-from typing import Optional, Generator, List, Dict, Any
+from typing import Optional, Generator, List, Dict, Any, Tuple
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, HTTPError, Timeout
 
-from config import AgentConfig, SUPPORTED_MODELS
+try:
+    from colorama import Fore, Style
+except ImportError:
+    # Fallback if colorama is not available: plain namespaces of empty strings
+    Fore = SimpleNamespace(YELLOW="", RESET_ALL="")
+    Style = SimpleNamespace(RESET_ALL="")
+
+# httpx is optional and only needed for concurrent requests (acall_api_many)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from config import AgentConfig, SUPPORTED_MODELS, MODEL_DISPLAY, TIMEOUT_TABLE
 from utils import (
     setup_directories, setup_logging, create_backup, process_file_inclusions,
-    get_api_key, list_available_files
+    get_api_key, list_available_files, iter_available_filenames, json_loads, json_dumps, load_history,
+    get_config_file, load_config_data, write_meta, retire_legacy_file,
+    HISTORY_FILE, LEGACY_HISTORY_FILE, CONFIG_FILE, LEGACY_CONFIG_FILE
 )
 
+# Server-Sent Events line prefix and end-of-stream sentinel for streamed chunks
+_DATA_PREFIX = b"data: "
+_DONE = b"[DONE]"
+
+# Message roles replayed to the API as conversation history
+_API_ROLES = ("user", "assistant")
+
+# Instructions for condensing older history into a single summary message
+_SUMMARY_PROMPT = (
+    "Summarize the following conversation so it can replace the original messages "
+    "as context for continuing it. Keep facts, decisions, code identifiers, open "
+    "questions and user preferences. Be concise."
+)
+
+# Retry backoff: exponential with full jitter, capped (seconds)
+_RETRY_BASE_DELAY = 1
+_RETRY_MAX_BACKOFF = 30
+_RETRY_MAX_DELAY = 60
+
+# Config fields that feed the API payload (and may be overridden per call)
+_PAYLOAD_FIELDS = (
+    "model", "text_verbosity", "reasoning_effort", "stream",
+    "max_output_tokens", "temperature", "top_p"
+)
+
+
+def _to_api_message(role: str, text: str) -> Dict[str, Any]:
+    """Wrap a message in the API content format"""
+    return {"role": role, "content": [{"type": "text", "text": text}]}
+
+
+def _is_replayed(message: Dict[str, Any]) -> bool:
+    """Whether a history message is sent to the API: user/assistant turns and our own history summary"""
+    return message["role"] in _API_ROLES or bool((message.get("metadata") or {}).get("summary"))
+
 
 class OpenAIGPTChatAgent:
     """Unified OpenAI GPT Chat Agent supporting all model variants"""
@@ -29,7 +84,8 @@ class OpenAIGPTChatAgent:
     def __init__(self, agent_id: str, model: str = "gpt-5"):
         self.agent_id = agent_id
         self.base_dir = Path(f"agents/{agent_id}")
-        self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.api_base = "https://api.openai.com/v1"
+        self.api_url = f"{self.api_base}/chat/completions"
         
         # Validate model
         if model not in SUPPORTED_MODELS:
@@ -42,28 +98,59 @@ class OpenAIGPTChatAgent:
         self.logger = setup_logging(agent_id, self.base_dir)
         
         # Load or create config
+        self._payload_base = None
+        self._system_message = None
+        self._history_fp = None
         self.config = self._load_config(model)
         
-        # Load conversation history
+        # Load conversation history and open the append-only log
+        self._last_backup_ts = None
+        self._messages_since_backup = 0
         self.messages = self._load_history()
+        if self.messages and not (self.base_dir / HISTORY_FILE).exists():
+            # Migrate legacy history.json to the JSONL log, then retire it so deleting
+            # history.jsonl resets the conversation instead of reviving the old one
+            self._save_history()
+            if (self.base_dir / HISTORY_FILE).exists():
+                retire_legacy_file(self.base_dir / LEGACY_HISTORY_FILE)
+        # The log may hold more than max_history_size records between compactions
+        self._log_records = len(self.messages)
+        del self.messages[:-self.config.max_history_size]
+        self._history_fp = self._open_history_log()
+        self._index_history()
+        self._write_meta()
         
         # Setup API key
         self.api_key = get_api_key(self.config.model, self.base_dir, self.logger)
         
-        model_display = SUPPORTED_MODELS[self.config.model]["name"]
+        # Setup HTTP session (keep-alive connection reuse across turns)
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self._session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        })
+        
+        model_display = MODEL_DISPLAY[self.config.model]
         self.logger.info(f"Initialized OpenAI {model_display} Chat Agent: {agent_id} with model: {self.config.model}")
 
     def _load_config(self, model: str) -> AgentConfig:
-        """Load agent configuration from config.yaml"""
-        config_file = self.base_dir / "config.yaml"
+        """Load agent configuration from config.json (migrating legacy config.yaml)"""
+        config_file = get_config_file(self.base_dir)
         
         if config_file.exists():
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f)
-                    # Ensure model is set correctly
-                    config_data['model'] = model
-                    return AgentConfig(**config_data)
+                config_data = load_config_data(self.base_dir)
+                # Ensure model is set correctly
+                config_data['model'] = model
+                config = AgentConfig(**config_data)
+                if config_file.name == LEGACY_CONFIG_FILE:
+                    # Migrate legacy config.yaml to config.json, then retire it so a
+                    # deleted config.json falls back to defaults, not the stale YAML
+                    self._save_config(config)
+                    if (self.base_dir / CONFIG_FILE).exists():
+                        retire_legacy_file(config_file)
+                return config
             except Exception as e:
                 self.logger.error(f"Error loading config: {e}")
                 config = AgentConfig(model=model)
@@ -75,45 +162,143 @@ class OpenAIGPTChatAgent:
             return config
 
     def _save_config(self, config: Optional[AgentConfig] = None):
-        """Save agent configuration to config.yaml"""
+        """Save agent configuration to config.json"""
         if config is None:
             config = self.config
             
         config.updated_at = datetime.now().isoformat()
-        config_file = self.base_dir / "config.yaml"
+        config_file = self.base_dir / CONFIG_FILE
+        
+        # Config may have changed: rebuild the payload skeleton on next request
+        self._payload_base = None
+        self._system_message = None
         
         try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(asdict(config), f, default_flow_style=False, allow_unicode=True)
+            config_file.write_bytes(json_dumps(config, indent=True))
         except Exception as e:
             self.logger.error(f"Error saving config: {e}")
+        
+        self._write_meta()
+
+    def _write_meta(self):
+        """Refresh meta.json, the summary --list reads instead of config and history"""
+        # Skipped while the agent is still loading; written once the history log is open
+        if self._history_fp is None:
+            return
+        
+        try:
+            write_meta(self.base_dir, {
+                "model": self.config.model,
+                "created_at": self.config.created_at,
+                "updated_at": self.config.updated_at,
+                "temperature": self.config.temperature,
+                "reasoning_effort": self.config.reasoning_effort,
+                "message_count": len(self.messages),
+            })
+        except Exception as e:
+            self.logger.error(f"Error saving agent summary: {e}")
+
+    def get_prompt_cache_key(self, model: Optional[str] = None) -> str:
+        """Return the pinned prompt cache key, or derive one from this agent's request prefix"""
+        if self.config.prompt_cache_key:
+            return self.config.prompt_cache_key
+        # Deterministic, so it is stable across sessions; a new model or system prompt
+        # (which invalidates the cached prefix anyway) yields a new key
+        prefix = json_dumps([self.agent_id, model or self.config.model, self.config.system_prompt,
+                             self.config.prompt_cache_salt])
+        return hashlib.blake2b(prefix, digest_size=16).hexdigest()
+
+    def reset_prompt_cache_key(self) -> str:
+        """Start a fresh server-side prompt cache: drop any pinned key and salt the derived one"""
+        self.config.prompt_cache_key = None
+        self.config.prompt_cache_salt = os.urandom(8).hex()
+        self._save_config()
+        cache_key = self.get_prompt_cache_key()
+        self.logger.info(f"Using prompt cache key: {cache_key}")
+        return cache_key
 
     def _load_history(self) -> List[Dict[str, Any]]:
-        """Load conversation history from history.json"""
-        history_file = self.base_dir / "history.json"
+        """Load conversation history from history.jsonl"""
+        try:
+            return load_history(self.base_dir, self.logger)
+        except Exception as e:
+            self.logger.error(f"Error loading history: {e}")
+            return []
+
+    def _index_history(self):
+        """Seed the running counters, API message and search caches in one pass over history"""
+        user_count = assistant_count = total_chars = 0
+        lowered_contents = []
+        api_messages = []
         
-        if history_file.exists():
-            try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.error(f"Error loading history: {e}")
-                return []
-        return []
+        for msg in self.messages:
+            role = msg["role"]
+            content = msg["content"]
+            if role == "user":
+                user_count += 1
+            elif role == "assistant":
+                assistant_count += 1
+            total_chars += len(content)
+            lowered_contents.append(content.lower())
+            # API-format history, kept in sync by add_message so payloads reuse it
+            if _is_replayed(msg):
+                api_messages.append(_to_api_message(role, content))
+        
+        self._user_count = user_count
+        self._assistant_count = assistant_count
+        self._total_chars = total_chars
+        self._first_ts = None
+        self._lowered_contents = lowered_contents
+        self._api_messages = api_messages
 
-    def _save_history(self):
-        """Save conversation history to history.json with backup"""
-        history_file = self.base_dir / "history.json"
+    def _open_history_log(self):
+        """Open history.jsonl for unbuffered appends"""
+        return open(self.base_dir / HISTORY_FILE, 'ab', buffering=0)
+
+    def _backup_history(self, force: bool = False):
+        """Back up history.jsonl, at most once per interval or message threshold"""
+        history_file = self.base_dir / HISTORY_FILE
+        if not history_file.exists():
+            return
+        
+        now = time.monotonic()
+        due = (
+            force
+            or self._last_backup_ts is None
+            or now - self._last_backup_ts >= self.config.backup_interval_seconds
+            or self._messages_since_backup >= self.config.backup_every_n_messages
+        )
+        if not due:
+            return
+        
+        create_backup(history_file, self.base_dir / "backups", self.logger)
+        self._last_backup_ts = now
+        self._messages_since_backup = 0
+
+    def _save_history(self, force_backup: bool = False):
+        """Rewrite the full history.jsonl (compaction) with backup"""
+        history_file = self.base_dir / HISTORY_FILE
+        tmp_file = self.base_dir / f"{HISTORY_FILE}.tmp"
+        
+        # Create backup if history exists (rate limited unless forced)
+        self._backup_history(force_backup)
         
-        # Create backup if history exists
-        if history_file.exists():
-            create_backup(history_file, self.base_dir / "backups", self.logger)
+        # The append handle points at the old file; release it before replacing
+        history_fp = self._history_fp
+        if history_fp is not None:
+            history_fp.close()
         
         try:
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.messages, f, indent=2, ensure_ascii=False)
+            with open(tmp_file, 'wb') as f:
+                f.write(b"".join(json_dumps(msg) + b"\n" for msg in self.messages))
+            os.replace(tmp_file, history_file)
+            self._log_records = len(self.messages)
         except Exception as e:
             self.logger.error(f"Error saving history: {e}")
+        
+        if history_fp is not None:
+            self._history_fp = self._open_history_log()
+            self._write_meta()
 
     def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         """Add a message to conversation history"""
@@ -125,68 +310,88 @@ class OpenAIGPTChatAgent:
         }
         
         self.messages.append(message)
+        self._messages_since_backup += 1
+        self._count_message(message, 1)
+        self._lowered_contents.append(content.lower())
+        if _is_replayed(message):
+            self._api_messages.append(_to_api_message(role, content))
         
-        # Truncate history if needed
+        # Truncate history in memory; the log keeps dropped records until it is compacted
         if len(self.messages) > self.config.max_history_size:
             removed = self.messages[:-self.config.max_history_size]
-            self.messages = self.messages[-self.config.max_history_size:]
-            self.logger.info(f"Truncated history: removed {len(removed)} old messages")
+            del self.messages[:len(removed)]
+            for old in removed:
+                self._count_message(old, -1)
+            del self._api_messages[:sum(1 for old in removed if _is_replayed(old))]
+            del self._lowered_contents[:len(removed)]
+            self._first_ts = None
+        
+        # Append only the new message: O(1) per turn regardless of history length
+        try:
+            self._history_fp.write(json_dumps(message) + b"\n")
+            self._log_records += 1
+        except Exception as e:
+            self.logger.error(f"Error saving history: {e}")
         
-        self._save_history()
+        # Compact in batches: one full rewrite once the log reaches ~1.5x the kept history
+        if self._log_records > self.config.max_history_size * 3 // 2:
+            self.logger.info(f"Compacting history: removed {self._log_records - len(self.messages)} old messages")
+            self._save_history()
+
+    def _count_message(self, message: Dict[str, Any], delta: int):
+        """Add (delta=1) or remove (delta=-1) a message from the running counters"""
+        role = message["role"]
+        if role == "user":
+            self._user_count += delta
+        elif role == "assistant":
+            self._assistant_count += delta
+        self._total_chars += delta * len(message["content"])
+
+    def _resolve_message(self, message: str) -> str:
+        """Resolve {filename} inclusions in a user message"""
+        return process_file_inclusions(message, self.base_dir, self.logger)
 
     def _build_api_payload(self, new_message: str, override_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Build the API request payload"""
-        # Process file inclusions
-        processed_message = process_file_inclusions(new_message, self.base_dir, self.logger)
-        
-        # Build messages in the API format
+        """Build the API request payload for an already resolved user message"""
+        # Build messages in the API format from the cached history
         messages = []
         
-        # Add system prompt as developer role if configured
+        # Add system prompt as developer role if configured. The same dict is
+        # reused every turn so the prompt prefix stays identical for caching
         if self.config.system_prompt:
-            messages.append({
-                "role": "developer",
-                "content": [
-                    {"type": "text", "text": self.config.system_prompt}
-                ]
-            })
+            if self._system_message is None:
+                self._system_message = _to_api_message("developer", self.config.system_prompt)
+            messages.append(self._system_message)
         
-        # Add conversation history
-        for msg in self.messages:
-            if msg["role"] in ["user", "assistant"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": [
-                        {"type": "text", "text": msg["content"]}
-                    ]
-                })
+        # Add conversation history and the new user message
+        messages.extend(self._api_messages)
+        messages.append(_to_api_message("user", new_message))
         
-        # Add new user message
-        messages.append({
-            "role": "user",
-            "content": [
-                {"type": "text", "text": processed_message}
-            ]
-        })
+        # Combine the config-derived skeleton with this turn's messages
+        payload = dict(self._get_payload_base(override_config))
+        payload["messages"] = messages
+        return payload
+
+    def _get_payload_base(self, override_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get the config-derived payload fields, cached until the config is saved"""
+        if not override_config and self._payload_base is not None:
+            return self._payload_base
         
-        # Apply config overrides
-        config = asdict(self.config)
+        config = {name: getattr(self.config, name) for name in _PAYLOAD_FIELDS}
         if override_config:
             config.update(override_config)
         
-        # Build payload
         payload = {
             "model": config["model"],
-            "messages": messages,
             "response_format": {"type": "text"},
             "verbosity": config["text_verbosity"],
-            "reasoning_effort": config["reasoning_effort"]
+            "reasoning_effort": config["reasoning_effort"],
+            "stream": config["stream"],
+            # Route this agent's requests to the same server-side prompt cache,
+            # across turns and across CLI invocations
+            "prompt_cache_key": self.get_prompt_cache_key(config["model"])
         }
         
-        # Add streaming if enabled
-        if config["stream"]:
-            payload["stream"] = True
-        
         # Add optional parameters
         if config.get("max_output_tokens"):
             payload["max_completion_tokens"] = config["max_output_tokens"]
@@ -196,7 +401,9 @@ class OpenAIGPTChatAgent:
             
         if config.get("top_p") != 1.0:
             payload["top_p"] = config["top_p"]
-            
+        
+        if not override_config:
+            self._payload_base = payload
         return payload
 
     def _get_timeout_for_reasoning(self, model: str = None, reasoning_effort: str = "medium") -> int:
@@ -204,62 +411,53 @@ class OpenAIGPTChatAgent:
         if model is None:
             model = self.config.model
             
-        model_info = SUPPORTED_MODELS.get(model)
-        if not model_info:
-            # Fallback to default timeout
-            return 300
-            
-        return model_info["reasoning_timeout"].get(reasoning_effort, 300)
+        # Fallback to default timeout for unknown model/effort combinations
+        return TIMEOUT_TABLE.get((model, reasoning_effort), 300)
 
     def _make_api_request(self, payload: Dict[str, Any]) -> requests.Response:
         """Make API request with retries and error handling"""
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-        
         # Get appropriate timeout
         model = payload.get("model", self.config.model)
         reasoning_effort = payload.get("reasoning_effort", "medium")
         timeout = self._get_timeout_for_reasoning(model, reasoning_effort)
         
-        model_display = SUPPORTED_MODELS.get(model, {}).get('name', model)
+        model_display = MODEL_DISPLAY.get(model, model)
         self.logger.info(f"Using timeout of {timeout}s for {model_display} with reasoning effort: {reasoning_effort}")
         
         max_retries = 3
-        base_delay = 1
         
         for attempt in range(max_retries):
             try:
                 self.logger.info(f"Making API request to {model_display} (attempt {attempt + 1}/{max_retries}) with {timeout}s timeout...")
                 
-                response = requests.post(
+                response = self._session.post(
                     self.api_url,
-                    headers=headers,
                     json=payload,
                     stream=payload.get("stream", True),
                     timeout=timeout
                 )
                 
+                # Branches ordered by likelihood: success, rate limit, server error
                 if response.status_code == 200:
                     self.logger.info("API request successful")
                     return response
+                
+                # Error responses are never returned: release the pooled connection now,
+                # since a streamed body holds it until closed
+                response.close()
+                if response.status_code == 429 or response.status_code >= 500:
+                    if attempt == max_retries - 1:
+                        break
+                    # Rate limited or server error - wait and retry
+                    delay = self._get_retry_delay(attempt, response.headers.get("Retry-After"))
+                    reason = "Rate limited" if response.status_code == 429 else f"Server error {response.status_code}"
+                    self.logger.warning(f"{reason}, retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
                 elif response.status_code == 401:
                     raise ValueError("Invalid API key")
                 elif response.status_code == 403:
                     raise ValueError("API access forbidden")
-                elif response.status_code == 429:
-                    # Rate limited - wait and retry
-                    delay = base_delay * (2 ** attempt)
-                    self.logger.warning(f"Rate limited, retrying in {delay}s...")
-                    time.sleep(delay)
-                    continue
-                elif response.status_code >= 500:
-                    # Server error - retry
-                    delay = base_delay * (2 ** attempt)
-                    self.logger.warning(f"Server error {response.status_code}, retrying in {delay}s...")
-                    time.sleep(delay)
-                    continue
                 else:
                     response.raise_for_status()
                     
@@ -267,54 +465,66 @@ class OpenAIGPTChatAgent:
                 self.logger.warning(f"Request timed out after {timeout}s (attempt {attempt + 1}/{max_retries})")
                 if attempt == max_retries - 1:
                     raise Exception(f"Request timed out after {timeout}s. Try reducing reasoning effort.")
-                delay = base_delay * (2 ** attempt)
-                self.logger.warning(f"Retrying in {delay}s...")
+                delay = self._get_retry_delay(attempt)
+                self.logger.warning(f"Retrying in {delay:.1f}s...")
                 time.sleep(delay)
             except RequestException as e:
                 if attempt == max_retries - 1:
                     raise
-                delay = base_delay * (2 ** attempt)
-                self.logger.warning(f"Request failed ({e}), retrying in {delay}s...")
+                delay = self._get_retry_delay(attempt)
+                self.logger.warning(f"Request failed ({e}), retrying in {delay:.1f}s...")
                 time.sleep(delay)
         
         raise Exception(f"Failed to complete API request after {max_retries} attempts")
 
+    def _get_retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Get a jittered exponential backoff delay, honoring the server's Retry-After"""
+        # Full jitter keeps agents sharing a rate limit from retrying in lockstep
+        delay = random.uniform(0, min(_RETRY_BASE_DELAY * (2 ** attempt), _RETRY_MAX_BACKOFF))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                # HTTP-date form is not used by the API; ignore it
+                pass
+        return min(delay, _RETRY_MAX_DELAY)
+
     def _parse_streaming_response(self, response: requests.Response) -> Generator[str, None, None]:
         """Parse streaming Server-Sent Events response"""
-        assistant_message = ""
+        chunks = []
+        prefix_len = len(_DATA_PREFIX)
         
         try:
-            for line in response.iter_lines(decode_unicode=True):
-                if not line or line.strip() == "":
+            # Work on raw bytes: no per-line decode, orjson parses bytes directly
+            for line in response.iter_lines(decode_unicode=False, chunk_size=8192):
+                if not line:
                     continue
                 
                 try:
                     # Handle Server-Sent Events format
-                    if line.startswith("data: "):
-                        data_str = line[5:].strip()
+                    if line.startswith(_DATA_PREFIX):
+                        data_str = line[prefix_len:]
                         
-                        if data_str == "[DONE]":
+                        if data_str == _DONE:
                             break
                             
-                        data = json.loads(data_str)
+                        data = json_loads(data_str)
                         
                         # Handle streaming format
-                        choices = data.get("choices", [])
+                        choices = data.get("choices")
                         if choices:
                             choice = choices[0]
-                            delta = choice.get("delta", {})
-                            content = delta.get("content", "")
+                            content = choice.get("delta", {}).get("content")
                             
                             if content:
-                                assistant_message += content
+                                chunks.append(content)
                                 yield content
                                 
                             # Check for completion
-                            finish_reason = choice.get("finish_reason")
-                            if finish_reason == "stop":
+                            if choice.get("finish_reason") == "stop":
                                 break
                             
-                except json.JSONDecodeError as e:
+                except ValueError as e:
                     self.logger.warning(f"Invalid JSON in stream: {e}")
                     continue
                 except Exception as e:
@@ -325,28 +535,29 @@ class OpenAIGPTChatAgent:
             self.logger.error(f"Error parsing streaming response: {e}")
             
         # Add assistant message to history if we got content
+        assistant_message = "".join(chunks)
         if assistant_message.strip():
             self.add_message("assistant", assistant_message)
 
+    def _extract_response_text(self, data: Dict[str, Any]) -> str:
+        """Extract the assistant text from a non-streaming response body"""
+        choices = data.get("choices", [])
+        if choices:
+            message = choices[0].get("message", {})
+            # Handle structured content format
+            content_array = message.get("content", [])
+            if isinstance(content_array, list) and content_array:
+                return content_array[0].get("text", "")
+            return message.get("content", "")
+        return ""
+
     def _parse_non_streaming_response(self, response: requests.Response) -> str:
         """Parse non-streaming response"""
         try:
-            data = response.json()
-            
-            # Extract message content
-            choices = data.get("choices", [])
-            if choices:
-                message = choices[0].get("message", {})
-                # Handle structured content format
-                content_array = message.get("content", [])
-                if isinstance(content_array, list) and content_array:
-                    content = content_array[0].get("text", "")
-                else:
-                    content = message.get("content", "")
-                    
-                if content:
-                    self.add_message("assistant", content)
-                    return content
+            content = self._extract_response_text(response.json())
+            if content:
+                self.add_message("assistant", content)
+                return content
                                 
             return "No response content received"
             
@@ -354,32 +565,77 @@ class OpenAIGPTChatAgent:
             self.logger.error(f"Error parsing non-streaming response: {e}")
             return f"Error parsing response: {e}"
 
+    def _maybe_summarize_history(self):
+        """Replace older messages with a summary once history exceeds the token budget"""
+        if not self.config.summarize_on_truncate:
+            return
+        
+        # Cheap token estimate (~4 characters per token)
+        if self._total_chars // 4 <= self.config.summary_trigger_tokens:
+            return
+        
+        # Only summarize once enough older messages have accumulated, so long
+        # recent messages alone do not cause a summary call on every turn
+        keep_recent = max(self.config.summary_keep_recent, 0)
+        split = len(self.messages) - keep_recent
+        if split < max(keep_recent, 2):
+            return
+        
+        older = self.messages[:split]
+        transcript = "\n\n".join(f"{msg['role']}: {msg['content']}" for msg in older)
+        
+        payload = dict(self._get_payload_base({"reasoning_effort": "low", "stream": False}))
+        payload["messages"] = [
+            _to_api_message("developer", _SUMMARY_PROMPT),
+            _to_api_message("user", transcript)
+        ]
+        
+        try:
+            self.logger.info(f"Summarizing {len(older)} older messages (~{self._total_chars // 4} tokens in history)")
+            summary = self._extract_response_text(self._make_api_request(payload).json())
+        except Exception as e:
+            self.logger.warning(f"History summarization failed, keeping full history: {e}")
+            return
+        
+        if not summary:
+            self.logger.warning("History summarization returned no content, keeping full history")
+            return
+        
+        summary_message = {
+            "role": "system",
+            "content": f"Prior conversation summary: {summary}",
+            # Keep the original start time so conversation duration stays meaningful
+            "timestamp": older[0]["timestamp"],
+            "metadata": {"summary": True, "summarized_messages": len(older)}
+        }
+        self.messages = [summary_message] + self.messages[split:]
+        self._index_history()
+        self._save_history(force_backup=True)
+        self.logger.info(f"Replaced {len(older)} messages with a summary")
+
     def call_api(self, new_message: str, override_config: Optional[Dict[str, Any]] = None) -> Generator[str, None, None]:
         """Call OpenAI API with the new message"""
         try:
-            # Add user message to history
-            self.add_message("user", new_message)
+            # Resolve file inclusions once; history stores what was actually sent
+            new_message = self._resolve_message(new_message)
             
-            # Build API payload
+            # Build API payload before recording the message, so it is not sent twice
             payload = self._build_api_payload(new_message, override_config)
             
+            # Add user message to history
+            self.add_message("user", new_message)
+            
             self.logger.info(f"Making API call to {self.api_url}")
-            self.logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
+            # Serializing the full history is O(history); only do it when DEBUG is on
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Payload: %s", json_dumps(payload, indent=True).decode('utf-8'))
             
             # Show model and reasoning info to user
             model = payload.get("model", self.config.model)
             reasoning_effort = payload.get("reasoning_effort", "medium")
-            model_display = SUPPORTED_MODELS.get(model, {}).get('name', model)
+            model_display = MODEL_DISPLAY.get(model, model)
             
             if reasoning_effort in ["medium", "high"]:
-                try:
-                    from colorama import Fore, Style
-                except ImportError:
-                    class Fore:
-                        YELLOW = RESET_ALL = ""
-                    class Style:
-                        RESET_ALL = ""
-                
                 timeout = self._get_timeout_for_reasoning(model, reasoning_effort)
                 print(f"{Fore.YELLOW}🤖 Using {model_display} with {reasoning_effort.upper()} reasoning (timeout: {timeout//60}min {timeout%60}s)...{Style.RESET_ALL}")
             
@@ -392,17 +648,181 @@ class OpenAIGPTChatAgent:
             else:
                 result = self._parse_non_streaming_response(response)
                 yield result
+            
+            # Condense older history once the reply has been delivered
+            self._maybe_summarize_history()
                 
         except Exception as e:
             error_msg = f"API call failed: {e}"
             self.logger.error(error_msg)
             yield error_msg
 
+    def submit_batch(self, prompts: List[str]) -> str:
+        """Submit prompts through the OpenAI Batch API and return the batch id"""
+        if not self.config.batch_mode:
+            raise ValueError("Batch mode is disabled. Set 'batch_mode: true' in the agent config to use it")
+        if not prompts:
+            raise ValueError("No prompts to submit")
+        
+        # One chat completion request per prompt, each against the current history
+        prompts = [self._resolve_message(prompt) for prompt in prompts]
+        lines = []
+        for i, prompt in enumerate(prompts):
+            body = self._build_api_payload(prompt)
+            body["stream"] = False
+            lines.append(json_dumps({
+                "custom_id": f"{self.agent_id}-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }))
+        
+        # Upload the JSONL input file (multipart, so drop the session's JSON content type)
+        response = self._session.post(
+            f"{self.api_base}/files",
+            data={"purpose": "batch"},
+            files={"file": (f"{self.agent_id}_batch.jsonl", b"\n".join(lines) + b"\n", "application/jsonl")},
+            headers={"Content-Type": None},
+            timeout=120
+        )
+        response.raise_for_status()
+        input_file_id = response.json()["id"]
+        
+        response = self._session.post(
+            f"{self.api_base}/batches",
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+                "metadata": {"agent_id": self.agent_id}
+            },
+            timeout=60
+        )
+        response.raise_for_status()
+        batch_id = response.json()["id"]
+        
+        # Remember the prompts so results can be added back to history in order
+        batches_dir = self.base_dir / "batches"
+        batches_dir.mkdir(exist_ok=True)
+        with open(batches_dir / f"{batch_id}.json", 'wb') as f:
+            f.write(json_dumps(prompts, indent=True))
+        
+        self.logger.info(f"Submitted batch {batch_id} with {len(prompts)} prompts")
+        return batch_id
+
+    def poll_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Check a batch and add its results to history once it has completed"""
+        response = self._session.get(f"{self.api_base}/batches/{batch_id}", timeout=60)
+        response.raise_for_status()
+        batch = response.json()
+        
+        if batch.get("status") != "completed" or not batch.get("output_file_id"):
+            return batch
+        
+        pending_file = self.base_dir / "batches" / f"{batch_id}.json"
+        if not pending_file.exists():
+            # Results were already added to history
+            return batch
+        
+        with open(pending_file, 'rb') as f:
+            prompts = json_loads(f.read())
+        
+        response = self._session.get(f"{self.api_base}/files/{batch['output_file_id']}/content", timeout=120)
+        response.raise_for_status()
+        
+        # Output order is not guaranteed; map results back by custom_id
+        replies = {}
+        for line in response.content.splitlines():
+            if not line.strip():
+                continue
+            result = json_loads(line)
+            body = (result.get("response") or {}).get("body") or {}
+            replies[result.get("custom_id")] = self._extract_response_text(body)
+        
+        for i, prompt in enumerate(prompts):
+            reply = replies.get(f"{self.agent_id}-{i}")
+            self.add_message("user", prompt, {"batch_id": batch_id})
+            if reply:
+                self.add_message("assistant", reply, {"batch_id": batch_id})
+            else:
+                self.logger.warning(f"No result for prompt {i} in batch {batch_id}")
+        
+        pending_file.unlink()
+        self.logger.info(f"Added {len(replies)} batch results from {batch_id} to history")
+        return batch
+
+    async def acall_api_many(self, prompts: List[str]) -> List[str]:
+        """Send independent prompts concurrently and return the replies in order"""
+        if httpx is None:
+            raise ImportError("Concurrent requests require httpx: pip install httpx")
+        
+        # Every prompt is answered against the current history, not each other
+        prompts = [self._resolve_message(prompt) for prompt in prompts]
+        payloads = [self._build_api_payload(prompt, {"stream": False}) for prompt in prompts]
+        semaphore = asyncio.Semaphore(max(self.config.max_concurrency, 1))
+        
+        async with httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            limits=httpx.Limits(max_keepalive_connections=32)
+        ) as client:
+            results = await asyncio.gather(
+                *(self._acall_one(client, semaphore, payload) for payload in payloads)
+            )
+        
+        # Record turns in prompt order once all replies are in
+        replies = []
+        for prompt, (reply, ok) in zip(prompts, results):
+            self.add_message("user", prompt)
+            if ok:
+                self.add_message("assistant", reply)
+            replies.append(reply)
+        return replies
+
+    async def _acall_one(self, client, semaphore: asyncio.Semaphore, payload: Dict[str, Any]) -> Tuple[str, bool]:
+        """Make one non-streaming request with retries; returns (text, succeeded)"""
+        timeout = self._get_timeout_for_reasoning(payload["model"], payload["reasoning_effort"])
+        max_retries = 3
+        
+        async with semaphore:
+            for attempt in range(max_retries):
+                try:
+                    response = await client.post(self.api_url, json=payload, timeout=timeout)
+                except httpx.HTTPError as e:
+                    if attempt == max_retries - 1:
+                        self.logger.error(f"API call failed: {e}")
+                        return f"API call failed: {e}", False
+                    await asyncio.sleep(self._get_retry_delay(attempt))
+                    continue
+                
+                if response.status_code == 200:
+                    # A malformed body fails only this prompt, not the whole gather()
+                    try:
+                        content = self._extract_response_text(response.json())
+                    except (ValueError, KeyError, AttributeError, IndexError) as e:
+                        self.logger.error(f"API call failed: invalid response body: {e}")
+                        return f"API call failed: invalid response body: {e}", False
+                    if content:
+                        return content, True
+                    return "No response content received", False
+                elif response.status_code == 429 or response.status_code >= 500:
+                    if attempt == max_retries - 1:
+                        break
+                    delay = self._get_retry_delay(attempt, response.headers.get("Retry-After"))
+                    self.logger.warning(f"HTTP {response.status_code}, retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+                    continue
+                else:
+                    self.logger.error(f"API call failed: HTTP {response.status_code}")
+                    return f"API call failed: HTTP {response.status_code}", False
+        
+        return f"API call failed after {max_retries} attempts", False
+
     def clear_history(self):
         """Clear conversation history"""
-        create_backup(self.base_dir / "history.json", self.base_dir / "backups", self.logger)
         self.messages.clear()
-        self._save_history()
+        self._index_history()
+        self._save_history(force_backup=True)
         self.logger.info("Conversation history cleared")
 
     def get_statistics(self) -> Dict[str, Any]:
@@ -419,20 +839,20 @@ class OpenAIGPTChatAgent:
                 "conversation_duration": None
             }
             
-        user_msgs = [m for m in self.messages if m["role"] == "user"]
-        assistant_msgs = [m for m in self.messages if m["role"] == "assistant"]
+        # Counters are maintained by add_message, so this is O(1) in history length
+        total_chars = self._total_chars
+        avg_length = total_chars // len(self.messages)
         
-        total_chars = sum(len(m["content"]) for m in self.messages)
-        avg_length = total_chars // len(self.messages) if self.messages else 0
-        
-        first_time = datetime.fromisoformat(self.messages[0]["timestamp"])
+        if self._first_ts is None:
+            self._first_ts = datetime.fromisoformat(self.messages[0]["timestamp"])
+        first_time = self._first_ts
         last_time = datetime.fromisoformat(self.messages[-1]["timestamp"])
         duration = last_time - first_time
         
         return {
             "total_messages": len(self.messages),
-            "user_messages": len(user_msgs),
-            "assistant_messages": len(assistant_msgs),
+            "user_messages": self._user_count,
+            "assistant_messages": self._assistant_count,
             "total_characters": total_chars,
             "average_message_length": avg_length,
             "first_message": first_time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -445,8 +865,10 @@ class OpenAIGPTChatAgent:
         results = []
         term_lower = term.lower()
         
-        for i, msg in enumerate(self.messages):
-            if term_lower in msg["content"].lower():
+        # Contents are lower-cased once when added, not on every search
+        for i, content_lower in enumerate(self._lowered_contents):
+            if term_lower in content_lower:
+                msg = self.messages[i]
                 results.append({
                     "index": i,
                     "message": msg,
@@ -460,4 +882,17 @@ class OpenAIGPTChatAgent:
 
     def list_files(self) -> List[str]:
         """List available files for inclusion"""
-        return list_available_files(self.base_dir)
\ No newline at end of file
+        return list_available_files(self.base_dir)
+
+    def iter_filenames(self) -> Generator[str, None, None]:
+        """Yield available file paths in discovery order, without sizes"""
+        return iter_available_filenames(self.base_dir)
+
+    def close(self):
+        """Back up history and release the history log and HTTP session"""
+        if self._messages_since_backup:
+            self._backup_history(force=True)
+        # Appends don't refresh meta.json (its history_size stamp marks it stale); bring it current here
+        self._write_meta()
+        self._history_fp.close()
+        self._session.close()
\ No newline at end of file
@@ -12,13 +12,18 @@ from datetime import datetime
 
 @dataclass
 class AgentConfig:
-    """Unified configuration settings for OpenAI GPT Chat Agents"""
+    """Unified configuration settings for OpenAI GPT Chat Agents (keep fields primitive)"""
     model: str = "gpt-5"
     temperature: float = 1.0
     reasoning_effort: str = "medium"  # low, medium, high
     reasoning_summary: str = "auto"   # auto, detailed, none
     max_output_tokens: Optional[int] = None
     max_history_size: int = 1000
+    backup_interval_seconds: int = 300  # minimum time between history backups
+    backup_every_n_messages: int = 50   # ...unless this many messages were added since
+    summarize_on_truncate: bool = False  # summarize old messages (an extra API call) instead of dropping them
+    summary_trigger_tokens: int = 6000  # estimated history tokens that trigger a summary
+    summary_keep_recent: int = 10       # most recent messages kept verbatim
     stream: bool = True
     system_prompt: Optional[str] = None
     store: bool = True
@@ -27,6 +32,10 @@ class AgentConfig:
     top_p: float = 1.0
     parallel_tool_calls: bool = True
     tool_choice: str = "auto"
+    batch_mode: bool = False  # allow submitting prompts through the Batch API
+    max_concurrency: int = 4  # parallel requests in acall_api_many
+    prompt_cache_key: Optional[str] = None  # pinned prompt cache routing key (derived per agent when unset)
+    prompt_cache_salt: str = ""  # set by --new-cache-key to start a fresh derived key
     created_at: str = ""
     updated_at: str = ""
 
@@ -55,8 +64,18 @@ SUPPORTED_MODELS = {
     }
 }
 
+# Flat lookup tables derived from SUPPORTED_MODELS (built once at import)
+MODEL_DISPLAY = {model: info["name"] for model, info in SUPPORTED_MODELS.items()}
+MODEL_DESCRIPTION = {model: info["description"] for model, info in SUPPORTED_MODELS.items()}
+
+TIMEOUT_TABLE = {
+    (model, effort): timeout
+    for model, info in SUPPORTED_MODELS.items()
+    for effort, timeout in info["reasoning_timeout"].items()
+}
+
 # Programming and common file extensions supported for file inclusion
-SUPPORTED_EXTENSIONS = {
+_EXTENSIONS = {
     # Programming languages
     '.py', '.r', '.js', '.ts', '.jsx', '.tsx', '.java', '.c', '.cpp', '.cc', '.cxx',
     '.h', '.hpp', '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala',
@@ -87,4 +106,7 @@ SUPPORTED_EXTENSIONS = {
     # Other useful formats
     '.editorconfig', '.gitignore', '.gitattributes', '.dockerignore', '.eslintrc',
     '.prettierrc', '.babelrc', '.webpack', '.rollup', '.vite', '.parcel'
-}
\ No newline at end of file
+}
+
+# Lowercase for lookups against lowercased suffixes
+SUPPORTED_EXTENSIONS = frozenset(ext.lower() for ext in _EXTENSIONS)
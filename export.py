@@ -5,116 +5,44 @@ Export functionality for OpenAI GPT Chat Agents
 This module provides conversation export capabilities in multiple formats.
 """
 
-import json
+import re
 import html
 from pathlib import Path
 from datetime import datetime
-from dataclasses import asdict
-from typing import Dict, Any, List
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Iterator, Optional
 
-from config import SUPPORTED_MODELS
+from config import MODEL_DISPLAY
+from utils import json_dumps
 
+# Display forms of the fixed set of message roles
+_ROLE_UPPER = {"user": "USER", "assistant": "ASSISTANT", "system": "SYSTEM", "tool": "TOOL"}
+_ROLE_TITLE = {"user": "User", "assistant": "Assistant", "system": "System", "tool": "Tool"}
+_ROLE_EMOJI = {"user": "🧑", "assistant": "🤖", "system": "🤖", "tool": "🤖"}
+_ROLE_AVATAR = {"user": "U", "assistant": "AI", "system": "AI", "tool": "AI"}
 
-def export_conversation(agent, format_type: str) -> str:
-    """Export conversation to specified format"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    export_dir = agent.base_dir / "exports"
-    
-    if format_type == "json":
-        return _export_json(agent, export_dir, timestamp)
-    elif format_type == "txt":
-        return _export_txt(agent, export_dir, timestamp)
-    elif format_type == "md":
-        return _export_md(agent, export_dir, timestamp)
-    elif format_type == "html":
-        return _export_html(agent, export_dir, timestamp)
-    else:
-        raise ValueError(f"Unsupported export format: {format_type}")
-
-
-def _export_json(agent, export_dir: Path, timestamp: str) -> str:
-    """Export conversation to JSON format"""
-    filename = f"conversation_{timestamp}.json"
-    filepath = export_dir / filename
-    
-    export_data = {
-        "agent_id": agent.agent_id,
-        "exported_at": datetime.now().isoformat(),
-        "config": asdict(agent.config),
-        "messages": agent.messages,
-        "statistics": agent.get_statistics()
-    }
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
-    
-    agent.logger.info(f"Exported conversation to {filepath}")
-    return str(filepath)
+# Fenced code blocks (``` ... ```) in already-escaped message text; an unterminated
+# fence runs to the end of the message
+_CODE_RE = re.compile(r'```(.*?)(?:```|\Z)', re.DOTALL)
 
 
-def _export_txt(agent, export_dir: Path, timestamp: str) -> str:
-    """Export conversation to TXT format"""
-    filename = f"conversation_{timestamp}.txt"
-    filepath = export_dir / filename
-    
-    model_display = SUPPORTED_MODELS.get(agent.config.model, {}).get('name', agent.config.model)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(f"OpenAI {model_display} Chat Agent Conversation Export\n")
-        f.write(f"Agent ID: {agent.agent_id}\n")
-        f.write(f"Model: {agent.config.model}\n")
-        f.write(f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("=" * 50 + "\n\n")
-        
-        for msg in agent.messages:
-            timestamp_str = datetime.fromisoformat(msg["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp_str}] {msg['role'].upper()}:\n")
-            f.write(f"{msg['content']}\n\n")
-    
-    agent.logger.info(f"Exported conversation to {filepath}")
-    return str(filepath)
-
-
-def _export_md(agent, export_dir: Path, timestamp: str) -> str:
-    """Export conversation to Markdown format"""
-    filename = f"conversation_{timestamp}.md"
-    filepath = export_dir / filename
-    
-    model_display = SUPPORTED_MODELS.get(agent.config.model, {}).get('name', agent.config.model)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(f"# OpenAI {model_display} Chat Agent Conversation\n\n")
-        f.write(f"**Agent ID:** {agent.agent_id}  \n")
-        f.write(f"**Model:** {agent.config.model}  \n")
-        f.write(f"**Exported:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n\n")
-        
-        for msg in agent.messages:
-            timestamp_str = datetime.fromisoformat(msg["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-            role_emoji = "🧑" if msg["role"] == "user" else "🤖"
-            f.write(f"## {role_emoji} {msg['role'].title()} - {timestamp_str}\n\n")
-            f.write(f"{msg['content']}\n\n")
-    
-    agent.logger.info(f"Exported conversation to {filepath}")
-    return str(filepath)
+def _code_block(match: re.Match) -> str:
+    """Wrap a fenced code block match for HTML output"""
+    return f'<div class="code-block">{match.group(1)}</div>'
 
 
-def _export_html(agent, export_dir: Path, timestamp: str) -> str:
-    """Export conversation to HTML format"""
-    filename = f"conversation_{timestamp}.html"
-    filepath = export_dir / filename
-    
-    stats = agent.get_statistics()
-    model_display = SUPPORTED_MODELS.get(agent.config.model, {}).get('name', agent.config.model)
-    
-    # HTML template with modern styling
-    html_template = f"""<!DOCTYPE html>
+# HTML export sections, formatted once per export; the stylesheet is static
+_HTML_HEAD_TMPL = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>OpenAI {model_display} Conversation - {agent.agent_id}</title>
+    <title>OpenAI {model_display} Conversation - {agent_id}</title>
     <style>
-        :root {{
+"""
+
+_HTML_CSS = """        :root {
             --primary-color: #2563eb;
             --secondary-color: #f1f5f9;
             --text-color: #1e293b;
@@ -122,102 +50,102 @@ def _export_html(agent, export_dir: Path, timestamp: str) -> str:
             --user-bg: #3b82f6;
             --assistant-bg: #10b981;
             --code-bg: #f8fafc;
-        }}
+        }
         
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             line-height: 1.6;
             color: var(--text-color);
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 2rem;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 4xl;
             margin: 0 auto;
             background: white;
             border-radius: 1rem;
             box-shadow: 0 25px 50px -12px rgba(0, 0, 0, 0.25);
             overflow: hidden;
-        }}
+        }
         
-        .header {{
+        .header {
             background: var(--primary-color);
             color: white;
             padding: 2rem;
             text-align: center;
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 2rem;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .header-info {{
+        .header-info {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1rem;
             margin-top: 2rem;
             font-size: 0.9rem;
-        }}
+        }
         
-        .stats {{
+        .stats {
             background: var(--secondary-color);
             padding: 1.5rem;
             border-bottom: 1px solid var(--border-color);
-        }}
+        }
         
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
             gap: 1rem;
-        }}
+        }
         
-        .stat-item {{
+        .stat-item {
             text-align: center;
             padding: 1rem;
             background: white;
             border-radius: 0.5rem;
             box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        }}
+        }
         
-        .stat-value {{
+        .stat-value {
             font-size: 1.5rem;
             font-weight: bold;
             color: var(--primary-color);
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             font-size: 0.8rem;
             color: #64748b;
             margin-top: 0.25rem;
-        }}
+        }
         
-        .messages {{
+        .messages {
             padding: 2rem;
             max-height: 70vh;
             overflow-y: auto;
-        }}
+        }
         
-        .message {{
+        .message {
             margin-bottom: 2rem;
             display: flex;
             align-items: flex-start;
             gap: 1rem;
-        }}
+        }
         
-        .message.user {{
+        .message.user {
             flex-direction: row-reverse;
-        }}
+        }
         
-        .message-avatar {{
+        .message-avatar {
             width: 3rem;
             height: 3rem;
             border-radius: 50%;
@@ -228,17 +156,17 @@ def _export_html(agent, export_dir: Path, timestamp: str) -> str:
             font-weight: bold;
             color: white;
             flex-shrink: 0;
-        }}
+        }
         
-        .message.user .message-avatar {{
+        .message.user .message-avatar {
             background: var(--user-bg);
-        }}
+        }
         
-        .message.assistant .message-avatar {{
+        .message.assistant .message-avatar {
             background: var(--assistant-bg);
-        }}
+        }
         
-        .message-content {{
+        .message-content {
             flex: 1;
             background: white;
             border: 1px solid var(--border-color);
@@ -246,43 +174,43 @@ def _export_html(agent, export_dir: Path, timestamp: str) -> str:
             padding: 1.5rem;
             box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
             position: relative;
-        }}
+        }
         
-        .message.user .message-content {{
+        .message.user .message-content {
             background: #eff6ff;
             border-color: var(--user-bg);
-        }}
+        }
         
-        .message.assistant .message-content {{
+        .message.assistant .message-content {
             background: #f0fdf4;
             border-color: var(--assistant-bg);
-        }}
+        }
         
-        .message-header {{
+        .message-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 1rem;
             padding-bottom: 0.5rem;
             border-bottom: 1px solid var(--border-color);
-        }}
+        }
         
-        .message-role {{
+        .message-role {
             font-weight: 600;
             text-transform: capitalize;
-        }}
+        }
         
-        .message-time {{
+        .message-time {
             font-size: 0.8rem;
             color: #64748b;
-        }}
+        }
         
-        .message-text {{
+        .message-text {
             white-space: pre-wrap;
             word-wrap: break-word;
-        }}
+        }
         
-        .code-block {{
+        .code-block {
             background: var(--code-bg);
             border: 1px solid var(--border-color);
             border-radius: 0.5rem;
@@ -291,43 +219,45 @@ def _export_html(agent, export_dir: Path, timestamp: str) -> str:
             overflow-x: auto;
             font-family: 'Monaco', 'Menlo', monospace;
             font-size: 0.9rem;
-        }}
+        }
         
-        .footer {{
+        .footer {
             background: var(--secondary-color);
             padding: 1rem 2rem;
             text-align: center;
             font-size: 0.8rem;
             color: #64748b;
             border-top: 1px solid var(--border-color);
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            body {{
+        @media (max-width: 768px) {
+            body {
                 padding: 1rem;
-            }}
+            }
             
-            .header {{
+            .header {
                 padding: 1.5rem;
-            }}
+            }
             
-            .header h1 {{
+            .header h1 {
                 font-size: 1.5rem;
-            }}
+            }
             
-            .header-info {{
+            .header-info {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .messages {{
+            .messages {
                 padding: 1rem;
-            }}
+            }
             
-            .message-content {{
+            .message-content {
                 padding: 1rem;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+_HTML_HEADER_TMPL = """    </style>
 </head>
 <body>
     <div class="container">
@@ -335,91 +265,272 @@ def _export_html(agent, export_dir: Path, timestamp: str) -> str:
             <h1>🤖 OpenAI {model_display} Chat Agent</h1>
             <p>Conversation Export</p>
             <div class="header-info">
-                <div><strong>Agent ID:</strong> {agent.agent_id}</div>
-                <div><strong>Model:</strong> {agent.config.model}</div>
-                <div><strong>Exported:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-                <div><strong>Temperature:</strong> {agent.config.temperature}</div>
+                <div><strong>Agent ID:</strong> {agent_id}</div>
+                <div><strong>Model:</strong> {model}</div>
+                <div><strong>Exported:</strong> {now_str}</div>
+                <div><strong>Temperature:</strong> {temperature}</div>
             </div>
         </div>
         
-        <div class="stats">
+"""
+
+_HTML_STATS_TMPL = """        <div class="stats">
             <div class="stats-grid">
                 <div class="stat-item">
-                    <div class="stat-value">{stats['total_messages']}</div>
+                    <div class="stat-value">{total_messages}</div>
                     <div class="stat-label">Total Messages</div>
                 </div>
                 <div class="stat-item">
-                    <div class="stat-value">{stats['user_messages']}</div>
+                    <div class="stat-value">{user_messages}</div>
                     <div class="stat-label">User Messages</div>
                 </div>
                 <div class="stat-item">
-                    <div class="stat-value">{stats['assistant_messages']}</div>
+                    <div class="stat-value">{assistant_messages}</div>
                     <div class="stat-label">Assistant Messages</div>
                 </div>
                 <div class="stat-item">
-                    <div class="stat-value">{stats['total_characters']:,}</div>
+                    <div class="stat-value">{total_characters:,}</div>
                     <div class="stat-label">Total Characters</div>
                 </div>
                 <div class="stat-item">
-                    <div class="stat-value">{stats['average_message_length']:,}</div>
+                    <div class="stat-value">{average_message_length:,}</div>
                     <div class="stat-label">Avg Message Length</div>
                 </div>
                 <div class="stat-item">
-                    <div class="stat-value">{stats.get('conversation_duration', 'N/A')}</div>
+                    <div class="stat-value">{conversation_duration}</div>
                     <div class="stat-label">Duration</div>
                 </div>
             </div>
         </div>
         
         <div class="messages">"""
-        
-    # Add messages
-    for msg in agent.messages:
-        timestamp_str = datetime.fromisoformat(msg["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-        role = msg["role"]
-        content = msg["content"]
-        
-        # Escape HTML and preserve formatting
-        content_escaped = html.escape(content)
-        
-        # Simple code block detection
-        if '```' in content_escaped:
-            parts = content_escaped.split('```')
-            formatted_content = ""
-            for i, part in enumerate(parts):
-                if i % 2 == 1:  # Code block
-                    formatted_content += f'<div class="code-block">{part}</div>'
-                else:  # Regular text
-                    formatted_content += part
-            content_escaped = formatted_content
-        
-        avatar_text = "U" if role == "user" else "AI"
-        
-        html_template += f"""
+
+_HTML_MSG_TMPL = """
         <div class="message {role}">
-            <div class="message-avatar">{avatar_text}</div>
+            <div class="message-avatar">{avatar}</div>
             <div class="message-content">
                 <div class="message-header">
                     <span class="message-role">{role}</span>
-                    <span class="message-time">{timestamp_str}</span>
+                    <span class="message-time">{ts}</span>
                 </div>
-                <div class="message-text">{content_escaped}</div>
+                <div class="message-text">{content}</div>
             </div>
         </div>"""
-    
-    # Close HTML
-    html_template += f"""
+
+_HTML_FOOTER_TMPL = """
         </div>
         
         <div class="footer">
-            Generated by OpenAI {model_display} Chat Agent • Agent ID: {agent.agent_id} • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            Generated by OpenAI {model_display} Chat Agent • Agent ID: {agent_id} • {now_str}
         </div>
     </div>
 </body>
 </html>"""
+
+
+@lru_cache(maxsize=32)
+def _txt_header(agent_id: str, model: str) -> str:
+    """Build the export-time-independent part of the TXT header"""
+    model_display = MODEL_DISPLAY.get(model, model)
+    return (
+        f"OpenAI {model_display} Chat Agent Conversation Export\n"
+        f"Agent ID: {agent_id}\n"
+        f"Model: {model}\n"
+    )
+
+
+@lru_cache(maxsize=32)
+def _md_header(agent_id: str, model: str) -> str:
+    """Build the export-time-independent part of the Markdown header"""
+    model_display = MODEL_DISPLAY.get(model, model)
+    return (
+        f"# OpenAI {model_display} Chat Agent Conversation\n\n"
+        f"**Agent ID:** {agent_id}  \n"
+        f"**Model:** {model}  \n"
+    )
+
+
+@lru_cache(maxsize=32)
+def _html_head(agent_id: str, model_display: str) -> str:
+    """Build the HTML document head, stylesheet included"""
+    head = _HTML_HEAD_TMPL.format(model_display=html.escape(model_display), agent_id=html.escape(agent_id))
+    return head + _HTML_CSS
+
+
+def export_conversation(agent, format_type: str) -> str:
+    """Export conversation to specified format"""
+    exporter = _EXPORTERS.get(format_type)
+    if exporter is None:
+        raise ValueError(f"Unsupported export format: {format_type}")
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    export_dir = agent.base_dir / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    return exporter(agent, export_dir, timestamp)
+
+
+def export_conversation_many(agent, formats: List[str]) -> List[str]:
+    """Export conversation to several formats in parallel"""
+    formats = list(dict.fromkeys(formats))
+    unsupported = [fmt for fmt in formats if fmt not in _EXPORTERS]
+    if unsupported:
+        raise ValueError(f"Unsupported export format: {', '.join(unsupported)}")
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    export_dir = agent.base_dir / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Statistics are computed once and shared by every format that embeds them
+    stats = agent.get_statistics() if _STATS_FORMATS.intersection(formats) else None
+    jobs = [
+        (_EXPORTERS[fmt], {"stats": stats} if fmt in _STATS_FORMATS else {})
+        for fmt in formats
+    ]
+    
+    if len(jobs) == 1:
+        exporter, kwargs = jobs[0]
+        return [exporter(agent, export_dir, timestamp, **kwargs)]
+    
+    # Exporters only read agent state and write distinct files, so they can run side by side
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(exporter, agent, export_dir, timestamp, **kwargs) for exporter, kwargs in jobs]
+        return [future.result() for future in futures]
+
+
+def _export_json(agent, export_dir: Path, timestamp: str, stats: Optional[Dict[str, Any]] = None) -> str:
+    """Export conversation to JSON format"""
+    filename = f"conversation_{timestamp}.json"
+    filepath = export_dir / filename
+    iso_now = datetime.now().isoformat()
+    
+    export_data = {
+        "agent_id": agent.agent_id,
+        "exported_at": iso_now,
+        # Serialized directly from the dataclass, without an intermediate dict
+        "config": agent.config,
+        "messages": agent.messages,
+        "statistics": stats if stats is not None else agent.get_statistics()
+    }
+    
+    # orjson (when available) serializes straight to UTF-8 bytes
+    filepath.write_bytes(json_dumps(export_data, indent=True))
     
     agent.logger.info(f"Exported conversation to {filepath}")
-    return str(filepath)
\ No newline at end of file
+    return str(filepath)
+
+
+def _export_txt(agent, export_dir: Path, timestamp: str) -> str:
+    """Export conversation to TXT format"""
+    filename = f"conversation_{timestamp}.txt"
+    filepath = export_dir / filename
+    
+    _fromiso = datetime.fromisoformat
+    _strfmt = "%Y-%m-%d %H:%M:%S"
+    now_str = datetime.now().strftime(_strfmt)
+    
+    header = f"{_txt_header(agent.agent_id, agent.config.model)}Exported: {now_str}\n{'=' * 50}\n\n"
+    body = "".join([
+        f"[{_fromiso(m['timestamp']).strftime(_strfmt)}] {_ROLE_UPPER.get(m['role']) or m['role'].upper()}:\n"
+        f"{m['content']}\n\n"
+        for m in agent.messages
+    ])
+    
+    # One write of the encoded payload instead of several per message
+    filepath.write_bytes((header + body).encode('utf-8'))
+    
+    agent.logger.info(f"Exported conversation to {filepath}")
+    return str(filepath)
+
+
+def _export_md(agent, export_dir: Path, timestamp: str) -> str:
+    """Export conversation to Markdown format"""
+    filename = f"conversation_{timestamp}.md"
+    filepath = export_dir / filename
+    
+    _fromiso = datetime.fromisoformat
+    _strfmt = "%Y-%m-%d %H:%M:%S"
+    now_str = datetime.now().strftime(_strfmt)
+    
+    header = f"{_md_header(agent.agent_id, agent.config.model)}**Exported:** {now_str}  \n\n"
+    body = "".join([
+        f"## {_ROLE_EMOJI.get(m['role'], '🤖')} {_ROLE_TITLE.get(m['role']) or m['role'].title()} - "
+        f"{_fromiso(m['timestamp']).strftime(_strfmt)}\n\n{m['content']}\n\n"
+        for m in agent.messages
+    ])
+    
+    filepath.write_bytes((header + body).encode('utf-8'))
+    
+    agent.logger.info(f"Exported conversation to {filepath}")
+    return str(filepath)
+
+
+def _html_fragments(agent, stats: Dict[str, Any], model_display: str) -> Iterator[str]:
+    """Yield the HTML export document piece by piece"""
+    _fromiso = datetime.fromisoformat
+    _escape = html.escape
+    _code_sub = _CODE_RE.sub
+    _msg_format = _HTML_MSG_TMPL.format_map
+    _strfmt = "%Y-%m-%d %H:%M:%S"
+    now_str = datetime.now().strftime(_strfmt)
+    
+    # Template values are escaped once up front, like an autoescaping template engine
+    fields = {
+        "model_display": _escape(model_display),
+        "agent_id": _escape(agent.agent_id),
+        "model": _escape(agent.config.model),
+        "temperature": agent.config.temperature,
+        "now_str": now_str,
+    }
+    
+    # HTML template with modern styling
+    yield _html_head(agent.agent_id, model_display)
+    yield _HTML_HEADER_TMPL.format_map(fields)
+    yield _HTML_STATS_TMPL.format_map({"conversation_duration": "N/A", **stats})
+    
+    # Add messages
+    for msg in agent.messages:
+        timestamp_str = _fromiso(msg["timestamp"]).strftime(_strfmt)
+        role = msg["role"]
+        content = msg["content"]
+        
+        # Escape HTML and preserve formatting, wrapping code blocks in one scan.
+        # Message text only lands in element content, never in an attribute value,
+        # so quotes need no escaping (keep quote=True for anything put in attributes).
+        # html.escape's chained str.replace calls beat a str.translate table, and the
+        # regex's own literal search is as cheap as a '```' pre-check on long messages
+        content_escaped = _code_sub(_code_block, _escape(content, quote=False))
+        
+        avatar_text = _ROLE_AVATAR.get(role, "AI")
+        
+        yield _msg_format({"role": role, "avatar": avatar_text, "ts": timestamp_str, "content": content_escaped})
+    
+    # Close HTML
+    yield _HTML_FOOTER_TMPL.format_map(fields)
+
+
+def _export_html(agent, export_dir: Path, timestamp: str, stats: Optional[Dict[str, Any]] = None) -> str:
+    """Export conversation to HTML format"""
+    filename = f"conversation_{timestamp}.html"
+    filepath = export_dir / filename
+    
+    if stats is None:
+        stats = agent.get_statistics()
+    model_display = MODEL_DISPLAY.get(agent.config.model, agent.config.model)
+    
+    # Stream fragments through a large buffer rather than building the whole document in memory
+    with open(filepath, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+        f.writelines(_html_fragments(agent, stats, model_display))
+    
+    agent.logger.info(f"Exported conversation to {filepath}")
+    return str(filepath)
+
+
+_EXPORTERS = {
+    "json": _export_json,
+    "txt": _export_txt,
+    "md": _export_md,
+    "html": _export_html,
+}
+
+# Formats whose exporter embeds conversation statistics (accepts stats=)
+_STATS_FORMATS = frozenset({"json", "html"})
@@ -34,32 +34,38 @@ Example Usage:
     python main.py --agent-id my-agent --config
 """
 
+import os
 import sys
-import json
-import yaml
+import time
 import argparse
+from itertools import islice
 from pathlib import Path
+from types import SimpleNamespace
 from datetime import datetime
 from dataclasses import asdict
+from typing import TYPE_CHECKING, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 
-from config import AgentConfig, SUPPORTED_MODELS
-from agent import OpenAIGPTChatAgent
-from export import export_conversation
+from config import AgentConfig, SUPPORTED_MODELS, MODEL_DISPLAY, MODEL_DESCRIPTION, TIMEOUT_TABLE
+from utils import (
+    get_config_file, load_config_data, get_history_file, iter_history, count_history, read_history_edges,
+    load_meta, write_meta, format_available_file, META_FIELDS
+)
+
+# agent (requests/asyncio) and export are imported where used so --list/--info start fast
+if TYPE_CHECKING:
+    from agent import OpenAIGPTChatAgent
 
 try:
     from colorama import Fore, Style, init as colorama_init
     colorama_init(autoreset=True)
 except ImportError:
-    # Fallback if colorama is not available
-    class Fore:
-        RED = GREEN = YELLOW = BLUE = MAGENTA = CYAN = WHITE = RESET = ""
-    class Style:
-        BRIGHT = DIM = RESET_ALL = ""
-
+    # Fallback if colorama is not available: plain namespaces of empty strings
+    Fore = SimpleNamespace(RED="", GREEN="", YELLOW="", BLUE="", MAGENTA="", CYAN="", WHITE="", RESET="")
+    Style = SimpleNamespace(BRIGHT="", DIM="", RESET_ALL="")
 
-def print_banner():
-    """Display beautiful ASCII banner"""
-    banner = f"""
+# Banner and box headers, rendered once at import
+_BANNER = f"""
 {Fore.CYAN}╔════════════════════════════════════════════════════════════════════════════════╗
 ║                                                                                ║
 ║   {Fore.WHITE}🤖 {Style.BRIGHT}OpenAI GPT Unified Chat Agent{Style.RESET_ALL}{Fore.CYAN}                                      ║
@@ -73,7 +79,104 @@ def print_banner():
 ║                                                                                ║
 ╚════════════════════════════════════════════════════════════════════════════════╝{Style.RESET_ALL}
 """
-    print(banner)
+
+# Each line ends in a reset, as colorama's autoreset did when they were printed one by one
+_EOL = f"{Style.RESET_ALL}\n{Style.RESET_ALL}"
+_BOX_TOP = f"\n{Fore.CYAN}╔════════════════════════════════════════════════════════════════╗{_EOL}"
+_BOX_BOTTOM = f"{_EOL}╚════════════════════════════════════════════════════════════════╝{Style.RESET_ALL}"
+_INFO_HEADER = (
+    _BOX_TOP
+    + f"║  {Fore.WHITE}{Style.BRIGHT}🤖 Agent Information: {Fore.YELLOW}{{agent_id:<35}}{Style.RESET_ALL}{Fore.CYAN} ║"
+    + _BOX_BOTTOM
+)
+_CONFIG_HEADER = (
+    _BOX_TOP
+    + f"║  {Fore.WHITE}{Style.BRIGHT}⚙️  Creating Agent Configuration{Style.RESET_ALL}{Fore.CYAN}                             ║"
+    + _BOX_BOTTOM
+)
+_CHAT_HEADER = (
+    _BOX_TOP
+    + f"║  {Fore.WHITE}{Style.BRIGHT}💬 Interactive Chat Session{Style.RESET_ALL}{Fore.CYAN}                                  ║"
+    + _BOX_BOTTOM
+)
+
+# /files shows this many entries, and stops counting the remainder past the cap
+_FILES_SHOWN = 20
+_FILES_COUNT_CAP = 1000
+
+# Streamed replies are flushed to the terminal at most this often (seconds)
+_STREAM_FLUSH_INTERVAL = 0.03
+
+# Agent list rendering: per-model colors and the row layout, built once
+_MODEL_COLOR = {"gpt-5": Fore.GREEN, "gpt-5-mini": Fore.BLUE}
+_AGENT_ROW = (
+    f"{Fore.WHITE}{{id:<20}} {{color}}{{model:<15}} {Fore.WHITE}{{messages:<10}} "
+    f"{{size:<10}} {{updated:<20}}{Style.RESET_ALL}"
+)
+
+
+def print_banner():
+    """Display beautiful ASCII banner"""
+    print(_BANNER)
+
+
+def _scan_agent(entry: os.DirEntry) -> Dict[str, Any]:
+    """Collect the --list summary for one agent directory"""
+    agent_dir = Path(entry.path)
+    
+    # Get basic info
+    agent_info = {
+        "id": entry.name,
+        "path": str(agent_dir),
+        "exists": True
+    }
+    
+    # Fast path: one small summary file, written by the agent and rebuilt below when stale
+    meta = load_meta(agent_dir)
+    if meta is not None:
+        agent_info.update(meta)
+        return agent_info
+    
+    config_file = get_config_file(agent_dir)
+    history_file = get_history_file(agent_dir)
+    
+    # Get config info
+    if config_file.exists():
+        try:
+            config = load_config_data(agent_dir)
+            agent_info["model"] = config.get("model", "gpt-5")
+            agent_info["created_at"] = config.get("created_at")
+            agent_info["updated_at"] = config.get("updated_at")
+            agent_info["temperature"] = config.get("temperature", 1.0)
+            agent_info["reasoning_effort"] = config.get("reasoning_effort", "medium")
+        except:
+            agent_info["model"] = "gpt-5"
+            agent_info["created_at"] = "Unknown"
+            agent_info["updated_at"] = "Unknown"
+            agent_info["temperature"] = 1.0
+            agent_info["reasoning_effort"] = "medium"
+    else:
+        agent_info["model"] = "gpt-5"
+        agent_info["created_at"] = "Unknown"
+        agent_info["updated_at"] = "Unknown"
+        agent_info["temperature"] = 1.0
+        agent_info["reasoning_effort"] = "medium"
+        
+    # Get history size (a single stat; a missing file raises instead of a separate exists check)
+    try:
+        agent_info["history_size"] = os.stat(history_file).st_size
+        agent_info["message_count"] = count_history(agent_dir)
+    except:
+        agent_info["message_count"] = 0
+        agent_info["history_size"] = 0
+    
+    # Cache the summary so the next listing can skip parsing
+    try:
+        write_meta(agent_dir, {key: agent_info[key] for key in META_FIELDS})
+    except OSError:
+        pass
+        
+    return agent_info
 
 
 def list_agents():
@@ -85,87 +188,56 @@ def list_agents():
         print(f"\n{Fore.YELLOW}📂 No agents directory found. Create your first agent to get started!{Style.RESET_ALL}\n")
         return
         
-    for agent_dir in agents_dir.iterdir():
-        if agent_dir.is_dir():
-            config_file = agent_dir / "config.yaml"
-            history_file = agent_dir / "history.json"
-            
-            # Get basic info
-            agent_info = {
-                "id": agent_dir.name,
-                "path": str(agent_dir),
-                "exists": True
-            }
-            
-            # Get config info
-            if config_file.exists():
-                try:
-                    with open(config_file) as f:
-                        config = yaml.safe_load(f)
-                        agent_info["model"] = config.get("model", "gpt-5")
-                        agent_info["created_at"] = config.get("created_at")
-                        agent_info["updated_at"] = config.get("updated_at")
-                        agent_info["temperature"] = config.get("temperature", 1.0)
-                        agent_info["reasoning_effort"] = config.get("reasoning_effort", "medium")
-                except:
-                    agent_info["model"] = "gpt-5"
-                    agent_info["created_at"] = "Unknown"
-                    agent_info["updated_at"] = "Unknown"
-                    agent_info["temperature"] = 1.0
-                    agent_info["reasoning_effort"] = "medium"
-            else:
-                agent_info["model"] = "gpt-5"
-                agent_info["created_at"] = "Unknown"
-                agent_info["updated_at"] = "Unknown"
-                agent_info["temperature"] = 1.0
-                agent_info["reasoning_effort"] = "medium"
-                
-            # Get history size
-            if history_file.exists():
-                try:
-                    with open(history_file) as f:
-                        history = json.load(f)
-                        agent_info["message_count"] = len(history)
-                        agent_info["history_size"] = history_file.stat().st_size
-                except:
-                    agent_info["message_count"] = 0
-                    agent_info["history_size"] = 0
-            else:
-                agent_info["message_count"] = 0
-                agent_info["history_size"] = 0
-                
-            agents.append(agent_info)
+    # scandir yields entries with their file type cached from the directory read
+    with os.scandir(agents_dir) as entries:
+        agent_entries = [entry for entry in entries if entry.is_dir()]
+    
+    # Per-agent scans are small-file I/O, which releases the GIL, so threads overlap them
+    if agent_entries:
+        with ThreadPoolExecutor(max_workers=min(16, len(agent_entries))) as executor:
+            agents = list(executor.map(_scan_agent, agent_entries))
     
     if not agents:
         print(f"\n{Fore.YELLOW}📂 No agents found. Create your first agent to get started!{Style.RESET_ALL}\n")
         return
         
-    # Sort by last updated
-    agents = sorted(agents, key=lambda x: x.get("updated_at", ""), reverse=True)
+    # Sort by last updated: ISO-8601 strings sort chronologically, so no parsing is needed here
+    agents = sorted(agents, key=lambda x: x.get("updated_at") or "", reverse=True)
+    _fromiso = datetime.fromisoformat
     
-    print(f"\n{Fore.CYAN}🤖 Available AI Agents:{Style.RESET_ALL}\n")
-    print(f"{Fore.WHITE}{Style.BRIGHT}{'Agent ID':<20} {'Model':<15} {'Messages':<10} {'Size':<10} {'Last Updated':<20}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'─' * 85}{Style.RESET_ALL}")
+    # Build the whole table and emit it in one write instead of one print per row
+    lines = [
+        f"\n{Fore.CYAN}🤖 Available AI Agents:{Style.RESET_ALL}\n",
+        f"{Fore.WHITE}{Style.BRIGHT}{'Agent ID':<20} {'Model':<15} {'Messages':<10} {'Size':<10} {'Last Updated':<20}{Style.RESET_ALL}",
+        f"{Fore.CYAN}{'─' * 85}{Style.RESET_ALL}",
+    ]
     
     for agent in agents:
-        updated = agent.get("updated_at", "Unknown")
+        # Parse only to reformat the timestamp for display
+        updated = agent.get("updated_at") or "Unknown"
         if updated != "Unknown":
             try:
-                updated = datetime.fromisoformat(updated).strftime("%Y-%m-%d %H:%M")
+                updated = _fromiso(updated).strftime("%Y-%m-%d %H:%M")
             except:
                 pass
         
         model = agent.get('model', 'gpt-5')
-        model_display = SUPPORTED_MODELS.get(model, {}).get('name', model)
+        model_display = MODEL_DISPLAY.get(model, model)
         
         # Format file size
         size = agent.get('history_size', 0)
         size_str = f"{size:,}B" if size < 1024 else f"{size/1024:.1f}K"
         
-        # Color code by model
-        model_color = Fore.GREEN if model == 'gpt-5' else Fore.BLUE if model == 'gpt-5-mini' else Fore.YELLOW
-        
-        print(f"{Fore.WHITE}{agent['id']:<20} {model_color}{model_display:<15} {Fore.WHITE}{agent.get('message_count', 0):<10} {size_str:<10} {updated:<20}{Style.RESET_ALL}")
+        lines.append(_AGENT_ROW.format(
+            id=agent['id'],
+            color=_MODEL_COLOR.get(model, Fore.YELLOW),
+            model=model_display,
+            messages=agent.get('message_count', 0),
+            size=size_str,
+            updated=updated,
+        ))
+    
+    print(_EOL.join(lines))
     
     print(f"\n{Fore.GREEN}💡 Tip: Use --agent-id <id> --model <model> to start a chat session{Style.RESET_ALL}\n")
 
@@ -178,30 +250,25 @@ def show_agent_info(agent_id: str):
         print(f"\n{Fore.RED}❌ Agent '{agent_id}' not found{Style.RESET_ALL}\n")
         return
         
-    print(f"\n{Fore.CYAN}╔════════════════════════════════════════════════════════════════╗")
-    print(f"║  {Fore.WHITE}{Style.BRIGHT}🤖 Agent Information: {Fore.YELLOW}{agent_id:<35}{Style.RESET_ALL}{Fore.CYAN} ║")
-    print(f"╚════════════════════════════════════════════════════════════════╝{Style.RESET_ALL}")
+    print(_INFO_HEADER.format(agent_id=agent_id))
     
     # Load and display config
-    config_file = agent_dir / "config.yaml"
+    config_file = get_config_file(agent_dir)
     if config_file.exists():
         try:
-            with open(config_file) as f:
-                config = yaml.safe_load(f)
-                
+            config = load_config_data(agent_dir)
+            
             model = config.get('model', 'gpt-5')
-            model_info = SUPPORTED_MODELS.get(model, {})
-            model_display = model_info.get('name', model)
+            model_display = MODEL_DISPLAY.get(model, model)
             
             print(f"\n{Fore.GREEN}⚙️  Configuration:")
             print(f"   {Fore.WHITE}Model: {Fore.CYAN}{model} ({model_display})")
-            print(f"   {Fore.WHITE}Description: {Fore.YELLOW}{model_info.get('description', 'N/A')}")
+            print(f"   {Fore.WHITE}Description: {Fore.YELLOW}{MODEL_DESCRIPTION.get(model, 'N/A')}")
             print(f"   {Fore.WHITE}Temperature: {Fore.CYAN}{config.get('temperature', 1.0)}")
             print(f"   {Fore.WHITE}Reasoning Effort: {Fore.CYAN}{config.get('reasoning_effort', 'medium')}")
             
             # Show timeout for current config
-            timeouts = model_info.get('reasoning_timeout', {})
-            current_timeout = timeouts.get(config.get('reasoning_effort', 'medium'), 300)
+            current_timeout = TIMEOUT_TABLE.get((model, config.get('reasoning_effort', 'medium')), 300)
             print(f"   {Fore.WHITE}Reasoning Timeout: {Fore.CYAN}{current_timeout}s ({current_timeout//60}min {current_timeout%60}s)")
             
             print(f"   {Fore.WHITE}Streaming: {Fore.CYAN}{config.get('stream', True)}")
@@ -212,26 +279,33 @@ def show_agent_info(agent_id: str):
             print(f"   {Fore.RED}Error loading config: {e}")
     
     # Display history stats
-    history_file = agent_dir / "history.json"
+    history_file = get_history_file(agent_dir)
     if history_file.exists():
         try:
-            with open(history_file) as f:
-                history = json.load(f)
-                    
-            user_msgs = len([m for m in history if m.get("role") == "user"])
-            assistant_msgs = len([m for m in history if m.get("role") == "assistant"])
-            total_chars = sum(len(m.get("content", "")) for m in history)
+            # Stream the log once instead of materializing the whole history
+            total_msgs = user_msgs = assistant_msgs = total_chars = 0
+            for m in iter_history(agent_dir):
+                role = m.get("role")
+                total_msgs += 1
+                total_chars += len(m.get("content", ""))
+                if role == "user":
+                    user_msgs += 1
+                elif role == "assistant":
+                    assistant_msgs += 1
             
             print(f"\n{Fore.GREEN}💬 Conversation History:")
-            print(f"   {Fore.WHITE}Total Messages: {Fore.CYAN}{len(history):,}")
+            print(f"   {Fore.WHITE}Total Messages: {Fore.CYAN}{total_msgs:,}")
             print(f"   {Fore.WHITE}User Messages: {Fore.CYAN}{user_msgs:,}")
             print(f"   {Fore.WHITE}Assistant Messages: {Fore.CYAN}{assistant_msgs:,}")
             print(f"   {Fore.WHITE}Total Characters: {Fore.CYAN}{total_chars:,}")
             print(f"   {Fore.WHITE}File Size: {Fore.CYAN}{history_file.stat().st_size:,} bytes")
                 
-            if history:
-                first_msg = datetime.fromisoformat(history[0]["timestamp"])
-                last_msg = datetime.fromisoformat(history[-1]["timestamp"])
+            if total_msgs:
+                # Head/tail reads of the log rather than tracking timestamps through the pass
+                first, last = read_history_edges(agent_dir)
+                _fromiso = datetime.fromisoformat
+                first_msg = _fromiso(first.get("timestamp"))
+                last_msg = _fromiso(last.get("timestamp"))
                 duration = last_msg - first_msg
                 print(f"   {Fore.WHITE}First Message: {Fore.CYAN}{first_msg.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"   {Fore.WHITE}Last Message: {Fore.CYAN}{last_msg.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -244,35 +318,41 @@ def show_agent_info(agent_id: str):
         
     # Display directory structure
     print(f"\n{Fore.GREEN}📁 Directory Structure:")
-    for item in sorted(agent_dir.rglob("*")):
-        if item.is_file():
-            size = item.stat().st_size
-            size_str = f"{size:,}B" if size < 1024 else f"{size/1024:.1f}K" if size < 1024*1024 else f"{size/(1024*1024):.1f}M"
-            rel_path = item.relative_to(agent_dir)
-            print(f"   {Fore.WHITE}{rel_path} {Fore.CYAN}({size_str})")
+    entries = []
+    for root, _, files in os.walk(agent_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                continue  # e.g. a dangling symlink
+            rel_path = os.path.relpath(path, agent_dir)
+            # Sort by path components, matching the ordering of Path objects
+            entries.append((rel_path.split(os.sep), rel_path, size))
+    entries.sort()
+    
+    for _, rel_path, size in entries:
+        size_str = f"{size:,}B" if size < 1024 else f"{size/1024:.1f}K" if size < 1024*1024 else f"{size/(1024*1024):.1f}M"
+        print(f"   {Fore.WHITE}{rel_path} {Fore.CYAN}({size_str})")
     
     print()
 
 
 def create_agent_config_interactive(model: str) -> AgentConfig:
     """Interactive configuration creation with enhanced UI"""
-    print(f"\n{Fore.CYAN}╔════════════════════════════════════════════════════════════════╗")
-    print(f"║  {Fore.WHITE}{Style.BRIGHT}⚙️  Creating Agent Configuration{Style.RESET_ALL}{Fore.CYAN}                             ║")
-    print(f"╚════════════════════════════════════════════════════════════════╝{Style.RESET_ALL}")
+    print(_CONFIG_HEADER)
     print(f"{Fore.YELLOW}💡 Press Enter to use default values{Style.RESET_ALL}\n")
     
     config = AgentConfig(model=model)
     
     # Display selected model info
-    model_info = SUPPORTED_MODELS.get(model, {})
-    print(f"{Fore.GREEN}🤖 Selected Model: {Fore.CYAN}{model_info.get('name', model)}")
-    print(f"   {Fore.WHITE}Description: {Fore.YELLOW}{model_info.get('description', 'N/A')}")
+    print(f"{Fore.GREEN}🤖 Selected Model: {Fore.CYAN}{MODEL_DISPLAY.get(model, model)}")
+    print(f"   {Fore.WHITE}Description: {Fore.YELLOW}{MODEL_DESCRIPTION.get(model, 'N/A')}")
     
-    timeouts = model_info.get("reasoning_timeout", {})
     print(f"   {Fore.WHITE}Reasoning Timeouts:")
-    print(f"     {Fore.WHITE}• Low: {Fore.CYAN}{timeouts.get('low', 60)}s")
-    print(f"     {Fore.WHITE}• Medium: {Fore.CYAN}{timeouts.get('medium', 120)}s") 
-    print(f"     {Fore.WHITE}• High: {Fore.CYAN}{timeouts.get('high', 240)}s")
+    print(f"     {Fore.WHITE}• Low: {Fore.CYAN}{TIMEOUT_TABLE.get((model, 'low'), 60)}s")
+    print(f"     {Fore.WHITE}• Medium: {Fore.CYAN}{TIMEOUT_TABLE.get((model, 'medium'), 120)}s") 
+    print(f"     {Fore.WHITE}• High: {Fore.CYAN}{TIMEOUT_TABLE.get((model, 'high'), 240)}s")
     print()
     
     # Temperature
@@ -293,7 +373,7 @@ def create_agent_config_interactive(model: str) -> AgentConfig:
         config.reasoning_effort = effort_input
         
         # Show timeout for selected effort
-        timeout = timeouts.get(config.reasoning_effort, 300)
+        timeout = TIMEOUT_TABLE.get((model, config.reasoning_effort), 300)
         print(f"   {Fore.GREEN}✅ Timeout for {config.reasoning_effort} effort: {timeout}s ({timeout//60}min {timeout%60}s){Style.RESET_ALL}")
     
     # Reasoning summary
@@ -325,15 +405,12 @@ def create_agent_config_interactive(model: str) -> AgentConfig:
     return config
 
 
-def interactive_chat(agent: OpenAIGPTChatAgent):
+def interactive_chat(agent: "OpenAIGPTChatAgent"):
     """Enhanced interactive chat session with beautiful UI"""
-    model_info = SUPPORTED_MODELS.get(agent.config.model, {})
-    model_display = model_info.get('name', agent.config.model)
+    model_display = MODEL_DISPLAY.get(agent.config.model, agent.config.model)
     
     # Chat header
-    print(f"\n{Fore.CYAN}╔════════════════════════════════════════════════════════════════╗")
-    print(f"║  {Fore.WHITE}{Style.BRIGHT}💬 Interactive Chat Session{Style.RESET_ALL}{Fore.CYAN}                                  ║")
-    print(f"╚════════════════════════════════════════════════════════════════╝{Style.RESET_ALL}")
+    print(_CHAT_HEADER)
     print(f"{Fore.GREEN}🤖 Model: {Fore.CYAN}{model_display}")
     print(f"{Fore.GREEN}👤 Agent: {Fore.YELLOW}{agent.agent_id}")
     print(f"{Fore.GREEN}🌡️  Temperature: {Fore.CYAN}{agent.config.temperature}")
@@ -359,7 +436,7 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                     print(f"{Fore.WHITE}/search <term>{Fore.CYAN} - Search conversation history")
                     print(f"{Fore.WHITE}/stats{Fore.CYAN} - Show conversation statistics")
                     print(f"{Fore.WHITE}/config{Fore.CYAN} - Show current configuration")
-                    print(f"{Fore.WHITE}/export <json|txt|md|html>{Fore.CYAN} - Export conversation")
+                    print(f"{Fore.WHITE}/export <json|txt|md|html> [...]{Fore.CYAN} - Export conversation")
                     print(f"{Fore.WHITE}/clear{Fore.CYAN} - Clear conversation history")
                     print(f"{Fore.WHITE}/files{Fore.CYAN} - List available files for inclusion")
                     print(f"{Fore.WHITE}/info{Fore.CYAN} - Show agent information")
@@ -370,9 +447,9 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                     # Show model info
                     print(f"{Fore.YELLOW}⚡ Current Model Details:")
                     print(f"   {Fore.WHITE}🤖 {model_display} ({agent.config.model})")
-                    print(f"   {Fore.WHITE}📝 {model_info.get('description', 'N/A')}")
-                    timeouts = model_info.get("reasoning_timeout", {})
-                    print(f"   {Fore.WHITE}⏱️  Timeouts: Low={timeouts.get('low', 60)}s, Medium={timeouts.get('medium', 120)}s, High={timeouts.get('high', 240)}s")
+                    model = agent.config.model
+                    print(f"   {Fore.WHITE}📝 {MODEL_DESCRIPTION.get(model, 'N/A')}")
+                    print(f"   {Fore.WHITE}⏱️  Timeouts: Low={TIMEOUT_TABLE.get((model, 'low'), 60)}s, Medium={TIMEOUT_TABLE.get((model, 'medium'), 120)}s, High={TIMEOUT_TABLE.get((model, 'high'), 240)}s")
                     print()
                     
                 elif command == 'history':
@@ -389,8 +466,9 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                         print(f"{Fore.YELLOW}📝 No messages in history{Style.RESET_ALL}")
                     else:
                         print(f"\n{Fore.YELLOW}📜 Last {len(recent_messages)} messages:")
+                        _fromiso = datetime.fromisoformat
                         for msg in recent_messages:
-                            timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%H:%M:%S")
+                            timestamp = _fromiso(msg["timestamp"]).strftime("%H:%M:%S")
                             role_color = Fore.CYAN if msg["role"] == "user" else Fore.GREEN
                             role_icon = "👤" if msg["role"] == "user" else "🤖"
                             content_preview = msg['content'][:100] + "..." if len(msg['content']) > 100 else msg['content']
@@ -409,9 +487,10 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                         print(f"{Fore.YELLOW}🔍 No matches found for '{search_term}'{Style.RESET_ALL}")
                     else:
                         print(f"\n{Fore.GREEN}🔍 Found {len(results)} matches for '{search_term}':")
+                        _fromiso = datetime.fromisoformat
                         for result in results:
                             msg = result["message"]
-                            timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%H:%M:%S")
+                            timestamp = _fromiso(msg["timestamp"]).strftime("%H:%M:%S")
                             role_color = Fore.CYAN if msg["role"] == "user" else Fore.GREEN
                             role_icon = "👤" if msg["role"] == "user" else "🤖"
                             print(f"   {Fore.WHITE}[{timestamp}] {role_color}{role_icon} {msg['role']}: {result['preview']}{Style.RESET_ALL}")
@@ -438,7 +517,7 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                     for key, value in config_dict.items():
                         if key not in ['created_at', 'updated_at']:
                             if key == 'model':
-                                model_name = SUPPORTED_MODELS.get(str(value), {}).get('name', value)
+                                model_name = MODEL_DISPLAY.get(str(value), value)
                                 print(f"   {Fore.WHITE}{key}: {Fore.CYAN}{value} ({model_name})")
                             elif key == 'reasoning_effort':
                                 timeout = agent._get_timeout_for_reasoning(agent.config.model, str(value))
@@ -449,17 +528,18 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                     
                 elif command == 'export':
                     if len(command_parts) < 2:
-                        print(f"{Fore.RED}❌ Usage: /export <json|txt|md|html>{Style.RESET_ALL}")
+                        print(f"{Fore.RED}❌ Usage: /export <json|txt|md|html> [...]{Style.RESET_ALL}")
                         continue
                     
-                    format_type = command_parts[1].lower()
-                    if format_type not in ['json', 'txt', 'md', 'html']:
+                    formats = [fmt.lower() for fmt in command_parts[1:]]
+                    if any(fmt not in ['json', 'txt', 'md', 'html'] for fmt in formats):
                         print(f"{Fore.RED}❌ Invalid format. Use: json, txt, md, or html{Style.RESET_ALL}")
                         continue
                     
                     try:
-                        filepath = export_conversation(agent, format_type)
-                        print(f"{Fore.GREEN}✅ Exported to: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
+                        from export import export_conversation_many
+                        for filepath in export_conversation_many(agent, formats):
+                            print(f"{Fore.GREEN}✅ Exported to: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
                     except Exception as e:
                         print(f"{Fore.RED}❌ Export failed: {e}{Style.RESET_ALL}")
                     
@@ -470,15 +550,21 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
                         print(f"{Fore.GREEN}✅ Conversation history cleared{Style.RESET_ALL}")
                     
                 elif command == 'files':
-                    files = agent.list_files()
-                    if not files:
+                    # Stream the scan: show the first 20 files found and stop counting the rest at a cap;
+                    # only the shown files are stat()ed for their size
+                    files = agent.iter_filenames()
+                    shown = list(islice(files, _FILES_SHOWN))
+                    if not shown:
                         print(f"{Fore.YELLOW}📁 No supported files found for inclusion{Style.RESET_ALL}")
                     else:
                         print(f"\n{Fore.GREEN}📁 Available files for inclusion:")
-                        for file_info in files[:20]:  # Limit to 20 files
-                            print(f"   {Fore.WHITE}{file_info}")
-                        if len(files) > 20:
-                            print(f"   {Fore.YELLOW}... and {len(files) - 20} more files")
+                        for filename in shown:
+                            print(f"   {Fore.WHITE}{format_available_file(Path(filename))}")
+                        more = sum(1 for _ in islice(files, _FILES_COUNT_CAP + 1))
+                        if more > _FILES_COUNT_CAP:
+                            print(f"   {Fore.YELLOW}... and {_FILES_COUNT_CAP:,}+ more files")
+                        elif more:
+                            print(f"   {Fore.YELLOW}... and {more} more files")
                     print(f"{Fore.GREEN}💡 Use {{filename}} in your message to include file contents{Style.RESET_ALL}\n")
                     
                 elif command == 'info':
@@ -497,10 +583,17 @@ def interactive_chat(agent: OpenAIGPTChatAgent):
             # Regular message - send to API
             print(f"\n{Fore.GREEN}{Style.BRIGHT}🤖 Assistant: {Style.RESET_ALL}", end="", flush=True)
             
-            response_text = ""
+            # Write chunks directly and flush at most every _STREAM_FLUSH_INTERVAL seconds
+            write = sys.stdout.write
+            flush = sys.stdout.flush
+            last_flush = time.monotonic()
             for chunk in agent.call_api(user_input):
-                print(chunk, end="", flush=True)
-                response_text += chunk
+                write(chunk)
+                now = time.monotonic()
+                if now - last_flush >= _STREAM_FLUSH_INTERVAL:
+                    flush()
+                    last_flush = now
+            flush()
             
             print("\n")
             
@@ -534,6 +627,9 @@ def main():
     
   {Fore.CYAN}%(prog)s --agent-id my-agent --config{Style.RESET_ALL}
     Configure agent interactively
+    
+  {Fore.CYAN}%(prog)s --agent-id my-agent --batch prompts.txt{Style.RESET_ALL}
+    Submit prompts through the Batch API (requires batch_mode: true)
         """
     )
     
@@ -546,7 +642,10 @@ def main():
     parser.add_argument("--effort", choices=["low", "medium", "high"], help="Override reasoning effort")
     parser.add_argument("--temperature", type=float, help="Override temperature (0.0-2.0)")
     parser.add_argument("--no-stream", action="store_true", help="Disable streaming")
-    parser.add_argument("--export", choices=["json", "txt", "md", "html"], help="Export conversation format")
+    parser.add_argument("--export", nargs="+", choices=["json", "txt", "md", "html"], help="Export conversation format(s)")
+    parser.add_argument("--new-cache-key", action="store_true", help="Start a fresh server-side prompt cache for this agent")
+    parser.add_argument("--batch", metavar="FILE", help="Submit prompts from FILE (one per line) via the Batch API")
+    parser.add_argument("--batch-status", metavar="BATCH_ID", help="Check a batch and add its results to history")
     
     args = parser.parse_args()
     
@@ -567,23 +666,50 @@ def main():
         parser.print_help()
         return
     
+    from agent import OpenAIGPTChatAgent
+    
+    agent = None
     try:
         # Initialize agent
-        print(f"{Fore.YELLOW}🚀 Initializing {SUPPORTED_MODELS[args.model]['name']} agent...{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}🚀 Initializing {MODEL_DISPLAY[args.model]} agent...{Style.RESET_ALL}")
         agent = OpenAIGPTChatAgent(args.agent_id, args.model)
         
         # Handle config command
         if args.config:
             new_config = create_agent_config_interactive(args.model)
+            # Keep a pinned key; a derived one follows the new model and system prompt
+            new_config.prompt_cache_key = agent.config.prompt_cache_key
+            new_config.prompt_cache_salt = agent.config.prompt_cache_salt
             agent.config = new_config
             agent._save_config()
             print(f"{Fore.GREEN}✅ Configuration saved successfully{Style.RESET_ALL}")
             return
         
+        if args.new_cache_key:
+            cache_key = agent.reset_prompt_cache_key()
+            print(f"{Fore.GREEN}✅ New prompt cache key: {Fore.CYAN}{cache_key}{Style.RESET_ALL}")
+        
         # Handle export command
         if args.export:
-            filepath = export_conversation(agent, args.export)
-            print(f"{Fore.GREEN}✅ Exported to: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
+            from export import export_conversation_many
+            for filepath in export_conversation_many(agent, args.export):
+                print(f"{Fore.GREEN}✅ Exported to: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
+            return
+        
+        # Handle batch commands
+        if args.batch:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                prompts = [line.strip() for line in f if line.strip()]
+            batch_id = agent.submit_batch(prompts)
+            print(f"{Fore.GREEN}✅ Submitted {len(prompts)} prompts as batch: {Fore.CYAN}{batch_id}{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW}💡 Check progress with --batch-status {batch_id}{Style.RESET_ALL}")
+            return
+        
+        if args.batch_status:
+            batch = agent.poll_batch(args.batch_status)
+            counts = batch.get("request_counts", {})
+            print(f"{Fore.GREEN}📦 Batch {Fore.CYAN}{batch.get('id')}{Fore.GREEN}: {Fore.YELLOW}{batch.get('status')}{Style.RESET_ALL}")
+            print(f"   {Fore.WHITE}Completed: {Fore.CYAN}{counts.get('completed', 0)}/{counts.get('total', 0)}{Fore.WHITE}, Failed: {Fore.CYAN}{counts.get('failed', 0)}{Style.RESET_ALL}")
             return
         
         # Apply command line overrides
@@ -611,6 +737,9 @@ def main():
     except Exception as e:
         print(f"{Fore.RED}❌ Error: {e}{Style.RESET_ALL}")
         sys.exit(1)
+    finally:
+        if agent is not None:
+            agent.close()
 
 
 if __name__ == "__main__":
@@ -6,14 +6,101 @@ This module provides common utilities for file handling, logging, and other shar
 """
 
 import os
-import json
+import sys
+import mmap
+import atexit
+import queue
 import logging
-import shutil
 import re
+import time
+import stat
+import heapq
+import tempfile
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any, Optional
-from config import SUPPORTED_EXTENSIONS
+from types import SimpleNamespace
+from dataclasses import is_dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from config import SUPPORTED_EXTENSIONS, MODEL_DISPLAY
+
+# Prefer orjson (C-accelerated) for JSON parsing, fall back to stdlib json
+# (imported only when needed; every json.* use below is on the orjson-missing path)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Reflink (copy-on-write clone) ioctl for cheap backups on btrfs/XFS; Linux only
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+_FICLONE = getattr(fcntl, "FICLONE", 0x40049409) if sys.platform.startswith("linux") else None
+
+# History storage: append-only JSON Lines log, with the legacy JSON array as fallback
+HISTORY_FILE = "history.jsonl"
+LEGACY_HISTORY_FILE = "history.json"
+
+# Suffix for legacy files once migrated, so they are kept but never read again
+MIGRATED_SUFFIX = ".migrated"
+
+# Config storage: JSON, with the legacy YAML file as fallback
+CONFIG_FILE = "config.json"
+LEGACY_CONFIG_FILE = "config.yaml"
+
+# Agent summary sidecar read by --list instead of parsing config and history
+META_FILE = "meta.json"
+META_FIELDS = ("model", "created_at", "updated_at", "temperature", "reasoning_effort", "message_count")
+
+# Extensionless files that are still supported for inclusion (lowercased names)
+_KNOWN_FILENAMES = frozenset({
+    'makefile', 'dockerfile', 'rakefile', 'gemfile', 'podfile',
+    'readme', 'license', 'changelog', 'authors', 'contributors',
+    'todo', 'manifest', 'requirements', 'pipfile', 'poetry'
+})
+
+# Comment-style header prepended to included files, by lowercased suffix
+_DEFAULT_FILE_HEADER = "// File: {name} ({ext})\n"
+_FILE_HEADER_FORMATS = {
+    '.py': "# File: {name} ({ext})\n",
+    '.r': "# File: {name} ({ext})\n",
+    '.html': "<!-- File: {name} ({ext}) -->\n",
+    '.xml': "<!-- File: {name} ({ext}) -->\n",
+    '.css': "/* File: {name} ({ext}) */\n",
+    '.scss': "/* File: {name} ({ext}) */\n",
+    '.sass': "/* File: {name} ({ext}) */\n",
+    '.sql': "-- File: {name} ({ext})\n",
+}
+
+# {filename} file inclusion tokens in user messages
+_INCLUDE_RE = re.compile(r'\{([^}]+)\}')
+
+# .gitignore rules that already cover saved API keys; the check runs once per process
+_SECRETS_IGNORE_RULES = frozenset({'secrets.json', '**/secrets.json'})
+_GITIGNORE_CHECKED = False
+
+# Upper bound on the combined size of files included into a single message
+_MAX_INCLUDE_TOTAL = 8 * 1024 * 1024
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize flat dataclasses for stdlib json (orjson handles them natively)"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8')
 
 
 def setup_directories(base_dir: Path) -> None:
@@ -30,9 +117,28 @@ def setup_directories(base_dir: Path) -> None:
         directory.mkdir(parents=True, exist_ok=True)
 
 
+# Queue handlers for open log files, keyed by resolved log file path; each has a
+# background listener that owns the FileHandler and is stopped (flushed) at exit
+_QUEUE_HANDLERS: Dict[Path, QueueHandler] = {}
+_LOG_LISTENERS: List[QueueListener] = []
+
+
+def _stop_log_listeners() -> None:
+    """Drain queued log records to disk and close the log files"""
+    for listener in _LOG_LISTENERS:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    _LOG_LISTENERS.clear()
+    _QUEUE_HANDLERS.clear()
+
+
+atexit.register(_stop_log_listeners)
+
+
 def setup_logging(agent_id: str, base_dir: Path) -> logging.Logger:
     """Configure logging to file and console"""
-    log_file = base_dir / "logs" / f"{datetime.now().strftime('%Y-%m-%d')}.log"
+    log_file = (base_dir / "logs" / f"{time.strftime('%Y-%m-%d')}.log").resolve()
     
     # Create logger
     logger = logging.getLogger(f"OpenAIGPTAgent_{agent_id}")
@@ -41,12 +147,22 @@ def setup_logging(agent_id: str, base_dir: Path) -> logging.Logger:
     # Remove existing handlers
     logger.handlers.clear()
     
-    # File handler
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(file_formatter)
+    # File handler, fed through a queue so log calls don't write on the caller's thread
+    # (reused per log file, so repeated setup doesn't open another descriptor)
+    queue_handler = _QUEUE_HANDLERS.get(log_file)
+    if queue_handler is None:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        file_handler.setFormatter(file_formatter)
+        
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        _LOG_LISTENERS.append(listener)
+        _QUEUE_HANDLERS[log_file] = queue_handler
     
     # Console handler
     console_handler = logging.StreamHandler()
@@ -54,130 +170,375 @@ def setup_logging(agent_id: str, base_dir: Path) -> logging.Logger:
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(logging.WARNING)
     
-    logger.addHandler(file_handler)
+    logger.addHandler(queue_handler)
     logger.addHandler(console_handler)
     
     return logger
 
 
+def get_config_file(base_dir: Path) -> Path:
+    """Return the config file in use (JSON, or legacy YAML if not yet migrated)"""
+    config_file = base_dir / CONFIG_FILE
+    legacy_file = base_dir / LEGACY_CONFIG_FILE
+    if not config_file.exists() and legacy_file.exists():
+        return legacy_file
+    return config_file
+
+
+def load_config_data(base_dir: Path) -> Dict[str, Any]:
+    """Load raw agent configuration from config.json (or legacy config.yaml)"""
+    config_file = get_config_file(base_dir)
+    if not config_file.exists():
+        return {}
+    
+    if config_file.name == LEGACY_CONFIG_FILE:
+        # PyYAML is only needed for unmigrated agents, so import it on demand
+        import yaml
+        # Prefer the libyaml-backed (C) loader when PyYAML was built with it
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=loader)
+    
+    with open(config_file, 'rb') as f:
+        return json_loads(f.read())
+
+
+def get_history_file(base_dir: Path) -> Path:
+    """Return the history file in use (JSONL log, or legacy JSON if not yet migrated)"""
+    history_file = base_dir / HISTORY_FILE
+    legacy_file = base_dir / LEGACY_HISTORY_FILE
+    if not history_file.exists() and legacy_file.exists():
+        return legacy_file
+    return history_file
+
+
+def retire_legacy_file(legacy_file: Path) -> None:
+    """Rename a migrated legacy file aside so it no longer shadows a deleted replacement"""
+    legacy_file.replace(legacy_file.with_name(legacy_file.name + MIGRATED_SUFFIX))
+
+
+def iter_history(base_dir: Path, logger: Optional[logging.Logger] = None) -> Iterator[Dict[str, Any]]:
+    """Yield conversation history messages one at a time from history.jsonl (or legacy history.json)"""
+    history_file = get_history_file(base_dir)
+    if not history_file.exists():
+        return
+    
+    with open(history_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        
+        # Map the file rather than reading it into a bytes copy; pages load on demand
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if history_file.name == LEGACY_HISTORY_FILE:
+                if orjson is None:
+                    yield from json.loads(mm[:])
+                    return
+                with memoryview(mm) as view:
+                    messages = orjson.loads(view)
+                yield from messages
+                return
+            
+            for line in iter(mm.readline, b""):
+                if not line.strip():
+                    continue
+                try:
+                    message = json_loads(line)
+                except ValueError as e:
+                    # A torn trailing write must not make the whole history unreadable
+                    if logger:
+                        logger.warning(f"Skipping corrupted history line: {e}")
+                    continue
+                yield message
+
+
+def load_history(base_dir: Path, logger: Optional[logging.Logger] = None) -> List[Dict[str, Any]]:
+    """Load conversation history from history.jsonl (or legacy history.json)"""
+    return list(iter_history(base_dir, logger))
+
+
+def count_history(base_dir: Path) -> int:
+    """Count history messages without parsing them (one JSONL record per line)"""
+    history_file = get_history_file(base_dir)
+    if not history_file.exists():
+        return 0
+    if history_file.name == LEGACY_HISTORY_FILE:
+        return len(load_history(base_dir))
+    
+    count = 0
+    last = b"\n"
+    with open(history_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    # A final record without its trailing newline still counts
+    return count if last == b"\n" else count + 1
+
+
+def _parse_history_lines(lines: Iterator[bytes]) -> Optional[Dict[str, Any]]:
+    """Return the first well-formed JSONL record among the given lines"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            return json_loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+def read_history_edges(base_dir: Path) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Return the (first, last) history messages without reading the whole JSONL log"""
+    history_file = get_history_file(base_dir)
+    if not history_file.exists():
+        return None, None
+    if history_file.name == LEGACY_HISTORY_FILE:
+        messages = load_history(base_dir)
+        return (messages[0], messages[-1]) if messages else (None, None)
+
+    with open(history_file, 'rb') as f:
+        first = _parse_history_lines(iter(f.readline, b""))
+        if first is None:
+            return None, None
+
+        # Scan backward from EOF in blocks until a complete last record is buffered
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            lines = buf.splitlines()
+            # The leading line may be cut at the block boundary, so only trust it at file start
+            last = _parse_history_lines(reversed(lines if pos == 0 else lines[1:]))
+            if last is not None:
+                return first, last
+    return first, first
+
+
+def _meta_stamp(base_dir: Path) -> Dict[str, Any]:
+    """Describe the config/history file state a meta.json snapshot is valid for"""
+    try:
+        config_mtime_ns = os.stat(get_config_file(base_dir)).st_mtime_ns
+    except OSError:
+        config_mtime_ns = None
+    try:
+        history_size = os.stat(get_history_file(base_dir)).st_size
+    except OSError:
+        history_size = 0
+    return {"config_mtime_ns": config_mtime_ns, "history_size": history_size}
+
+
+def write_meta(base_dir: Path, summary: Dict[str, Any]) -> None:
+    """Atomically write the agent summary sidecar, stamped with the current file state"""
+    data = json_dumps({**summary, **_meta_stamp(base_dir)})
+    # A unique temp file per writer: --list and a running agent may both refresh the sidecar
+    with tempfile.NamedTemporaryFile(dir=base_dir, prefix=f"{META_FILE}.", suffix=".tmp", delete=False) as f:
+        f.write(data)
+    try:
+        os.replace(f.name, base_dir / META_FILE)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def load_meta(base_dir: Path) -> Optional[Dict[str, Any]]:
+    """Load the agent summary sidecar, or None if missing or out of date"""
+    try:
+        with open(base_dir / META_FILE, 'rb') as f:
+            meta = json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    # Config or history changed since the snapshot (e.g. a hand edit or an interrupted write)
+    stamp = _meta_stamp(base_dir)
+    if any(meta.get(key) != value for key, value in stamp.items()):
+        return None
+    if any(key not in meta for key in META_FIELDS):
+        return None
+    return meta
+
+
+def _clone_or_copy(src: Path, dst: Path) -> None:
+    """Copy file data, as a copy-on-write reflink when the filesystem supports it"""
+    # Not a hard link: history.jsonl is appended in place, which would change a linked backup too
+    if fcntl is not None and _FICLONE is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass
+    # Data only (no copystat); the kernel copies it via sendfile where available
+    import shutil
+    shutil.copyfile(src, dst)
+
+
 def create_backup(history_file: Path, backup_dir: Path, logger: logging.Logger) -> None:
     """Create rolling backup of history"""
     if not history_file.exists():
         return
         
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = backup_dir / f"history_{timestamp}.json"
+    # time.strftime formats the local time directly, without building a datetime
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    backup_file = backup_dir / f"history_{timestamp}{history_file.suffix}"
     
     try:
-        shutil.copy2(history_file, backup_file)
+        _clone_or_copy(history_file, backup_file)
         
-        # Keep only last 10 backups
-        backups = sorted(backup_dir.glob("history_*.json"))
-        while len(backups) > 10:
-            oldest = backups.pop(0)
-            oldest.unlink()
+        # Keep only last 10 backups (timestamped names sort chronologically; no sort needed when under the cap)
+        with os.scandir(backup_dir) as entries:
+            backups = [entry.name for entry in entries if entry.name.startswith("history_")]
+        if len(backups) > 10:
+            for name in heapq.nsmallest(len(backups) - 10, backups):
+                (backup_dir / name).unlink()
             
     except Exception as e:
         logger.error(f"Error creating backup: {e}")
 
 
+@lru_cache(maxsize=4096)
+def _is_supported_suffix(suffix: str) -> bool:
+    """Check a file suffix against SUPPORTED_EXTENSIONS (memoized: few distinct suffixes recur)"""
+    return suffix.lower() in SUPPORTED_EXTENSIONS
+
+
+def _search_paths(base_dir: Path) -> List[Path]:
+    """Directories searched for included files, in priority order"""
+    return [
+        Path('.'),
+        Path('src'),
+        Path('lib'),
+        Path('scripts'),
+        Path('data'),
+        Path('documents'),
+        Path('files'),
+        Path('config'),
+        Path('configs'),
+        base_dir / 'uploads'
+    ]
+
+
+def _listing_roots(base_dir: Path) -> List[Path]:
+    """Existing search paths to walk, minus those already covered by an earlier (ancestor) walk"""
+    roots = []
+    walked = []
+    for search_path in _search_paths(base_dir):
+        if not search_path.exists():
+            continue
+        resolved = search_path.resolve()
+        # A nested path is covered unless the walk would skip it as hidden
+        if any(resolved.is_relative_to(parent) and
+               not any(part.startswith('.') for part in resolved.relative_to(parent).parts)
+               for parent in walked):
+            continue
+        walked.append(resolved)
+        roots.append(search_path)
+    return roots
+
+
 def is_supported_file(file_path: Path) -> bool:
     """Check if file extension is supported for inclusion"""
-    if file_path.suffix.lower() in SUPPORTED_EXTENSIONS:
+    if _is_supported_suffix(file_path.suffix):
         return True
     
     # Check for files without extensions but with known names
-    known_files = {
-        'makefile', 'dockerfile', 'rakefile', 'gemfile', 'podfile',
-        'readme', 'license', 'changelog', 'authors', 'contributors',
-        'todo', 'manifest', 'requirements', 'pipfile', 'poetry'
-    }
-    
-    return file_path.name.lower() in known_files
+    return file_path.name.lower() in _KNOWN_FILENAMES
+
+
+def _stat_file(file_path: Path) -> Optional[os.stat_result]:
+    """Stat a path once, returning the result only if it is a regular file"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
+def _find_include(filename: str, base_dir: Path) -> Optional[Tuple[Path, os.stat_result]]:
+    """Return the first search path candidate for filename that is a file, with its stat"""
+    for search_path in _search_paths(base_dir):
+        file_path = search_path / filename
+        st = _stat_file(file_path)
+        if st is not None:
+            return file_path, st
+    return None
 
 
 def process_file_inclusions(content: str, base_dir: Path, logger: logging.Logger) -> str:
     """Replace {filename} patterns with file contents"""
+    # Most messages include no files; skip the regex entirely for them
+    if '{' not in content:
+        return content
+    
+    included_bytes = 0
+    
     def replace_file(match):
+        nonlocal included_bytes
         filename = match.group(1)
         
-        # Search paths
-        search_paths = [
-            Path('.'),
-            Path('src'),
-            Path('lib'),
-            Path('scripts'),
-            Path('data'),
-            Path('documents'),
-            Path('files'),
-            Path('config'),
-            Path('configs'),
-            base_dir / 'uploads'
-        ]
+        # One stat per candidate, whose result also serves the size check
+        found = _find_include(filename, base_dir)
+        if found is None:
+            logger.warning(f"File not found: {filename}")
+            return f"[ERROR: File {filename} not found]"
+        file_path, file_stat = found
         
-        for search_path in search_paths:
-            file_path = search_path / filename
-            if file_path.exists() and file_path.is_file():
-                
-                # Check if file is supported
-                if not is_supported_file(file_path):
-                    logger.warning(f"Unsupported file type: {filename}")
-                    return f"[WARNING: Unsupported file type {filename}]"
-                
-                try:
-                    # Check file size (limit to 2MB for programming files)
-                    max_size = 2 * 1024 * 1024  # 2MB
-                    if file_path.stat().st_size > max_size:
-                        logger.error(f"File {filename} too large (>2MB)")
-                        return f"[ERROR: File {filename} too large (max 2MB)]"
-                    
-                    # Try multiple encodings for robust file reading
-                    file_content = None
-                    encodings_to_try = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
-                    
-                    for encoding in encodings_to_try:
-                        try:
-                            with open(file_path, 'r', encoding=encoding) as f:
-                                file_content = f.read()
-                                break
-                        except (UnicodeDecodeError, UnicodeError):
-                            continue
-                    
-                    if file_content is None:
-                        # Final fallback - read as binary and decode with errors='replace'
-                        try:
-                            with open(file_path, 'rb') as f:
-                                raw_content = f.read()
-                                file_content = raw_content.decode('utf-8', errors='replace')
-                                logger.warning(f"File {filename} contained non-standard encoding, some characters may be garbled")
-                        except Exception as e:
-                            logger.error(f"Could not read file {filename} with any encoding: {e}")
-                            return f"[ERROR: Could not decode file {filename}]"
-                    
-                    # Add file info header for programming files
-                    file_info = f"// File: {filename} ({file_path.suffix})\n"
-                    if file_path.suffix.lower() in ['.py', '.r']:
-                        file_info = f"# File: {filename} ({file_path.suffix})\n"
-                    elif file_path.suffix.lower() in ['.html', '.xml']:
-                        file_info = f"<!-- File: {filename} ({file_path.suffix}) -->\n"
-                    elif file_path.suffix.lower() in ['.css', '.scss', '.sass']:
-                        file_info = f"/* File: {filename} ({file_path.suffix}) */\n"
-                    elif file_path.suffix.lower() in ['.sql']:
-                        file_info = f"-- File: {filename} ({file_path.suffix})\n"
-                    
-                    full_content = file_info + file_content
-                    
-                    logger.info(f"Included file: {filename} ({len(file_content)} chars, {file_path.suffix})")
-                    return full_content
-                    
-                except Exception as e:
-                    logger.error(f"Error reading file {filename}: {e}")
-                    return f"[ERROR: Could not read {filename}: {e}]"
+        # Check if file is supported
+        if not is_supported_file(file_path):
+            logger.warning(f"Unsupported file type: {filename}")
+            return f"[WARNING: Unsupported file type {filename}]"
         
-        logger.warning(f"File not found: {filename}")
-        return f"[ERROR: File {filename} not found]"
+        try:
+            # Check file size (limit to 2MB for programming files)
+            max_size = 2 * 1024 * 1024  # 2MB
+            if file_stat.st_size > max_size:
+                logger.error(f"File {filename} too large (>2MB)")
+                return f"[ERROR: File {filename} too large (max 2MB)]"
+            
+            # Bound the total size included into one message, before reading anything
+            if included_bytes + file_stat.st_size > _MAX_INCLUDE_TOTAL:
+                logger.warning(f"Skipped file {filename}: message inclusion limit (8MB) reached")
+                return f"[ERROR: File {filename} skipped, message inclusion limit (8MB) reached]"
+            included_bytes += file_stat.st_size
+            
+            # Read once, then decode: UTF-8 first, else Latin-1 (which maps every byte)
+            raw_content = file_path.read_bytes()
+            try:
+                file_content = raw_content.decode('utf-8')
+            except UnicodeDecodeError:
+                file_content = raw_content.decode('latin-1')
+            
+            # Add file info header for programming files
+            suffix = file_path.suffix
+            header = _FILE_HEADER_FORMATS.get(suffix.lower(), _DEFAULT_FILE_HEADER)
+            file_info = header.format(name=filename, ext=suffix)
+            
+            full_content = file_info + file_content
+            
+            logger.info(f"Included file: {filename} ({len(file_content)} chars, {file_path.suffix})")
+            return full_content
+            
+        except Exception as e:
+            logger.error(f"Error reading file {filename}: {e}")
+            return f"[ERROR: Could not read {filename}: {e}]"
     
-    return re.sub(r'\{([^}]+)\}', replace_file, content)
+    return _INCLUDE_RE.sub(replace_file, content)
+
+
+def _ensure_secrets_gitignored() -> None:
+    """Add secrets.json to .gitignore unless a rule for it exists (checked once per process)"""
+    global _GITIGNORE_CHECKED
+    if _GITIGNORE_CHECKED:
+        return
+    
+    gitignore_file = Path('.gitignore')
+    lines = gitignore_file.read_text().splitlines() if gitignore_file.exists() else []
+    # Match whole rules; a substring test also matched e.g. comments or unrelated paths
+    if not any(line.strip() in _SECRETS_IGNORE_RULES for line in lines):
+        with open(gitignore_file, 'a') as f:
+            f.write('\n# API Keys\n**/secrets.json\nsecrets.json\n')
+    _GITIGNORE_CHECKED = True
 
 
 def get_api_key(model: str, base_dir: Path, logger: logging.Logger) -> str:
@@ -185,10 +546,8 @@ def get_api_key(model: str, base_dir: Path, logger: logging.Logger) -> str:
     try:
         from colorama import Fore, Style
     except ImportError:
-        class Fore:
-            RED = GREEN = YELLOW = BLUE = MAGENTA = CYAN = WHITE = RESET = ""
-        class Style:
-            BRIGHT = DIM = RESET_ALL = ""
+        Fore = SimpleNamespace(RED="", GREEN="", YELLOW="", BLUE="", MAGENTA="", CYAN="", WHITE="", RESET="")
+        Style = SimpleNamespace(BRIGHT="", DIM="", RESET_ALL="")
     
     # First try environment variable
     api_key = os.getenv('OPENAI_API_KEY')
@@ -200,8 +559,8 @@ def get_api_key(model: str, base_dir: Path, logger: logging.Logger) -> str:
     secrets_file = base_dir / "secrets.json"
     if secrets_file.exists():
         try:
-            with open(secrets_file, 'r') as f:
-                secrets = json.load(f)
+            with open(secrets_file, 'rb') as f:
+                secrets = json_loads(f.read())
                 keys = secrets.get('keys', {})
                 # Use model-specific key or default
                 api_key = keys.get(model) or keys.get('default')
@@ -212,8 +571,7 @@ def get_api_key(model: str, base_dir: Path, logger: logging.Logger) -> str:
             logger.error(f"Error reading secrets file: {e}")
     
     # Prompt user for API key
-    from config import SUPPORTED_MODELS
-    model_display = SUPPORTED_MODELS.get(model, {}).get('name', model)
+    model_display = MODEL_DISPLAY.get(model, model)
     print(f"{Fore.YELLOW}API key not found for OpenAI {model_display} model.")
     print(f"You can set the OPENAI_API_KEY environment variable or enter it now.{Style.RESET_ALL}")
     
@@ -232,18 +590,10 @@ def get_api_key(model: str, base_dir: Path, logger: logging.Logger) -> str:
     }
     
     try:
-        with open(secrets_file, 'w') as f:
-            json.dump(secrets, f, indent=2)
+        secrets_file.write_bytes(json_dumps(secrets, indent=True))
         
         # Add to .gitignore
-        gitignore_file = Path('.gitignore')
-        gitignore_content = ""
-        if gitignore_file.exists():
-            gitignore_content = gitignore_file.read_text()
-        
-        if 'secrets.json' not in gitignore_content:
-            with open(gitignore_file, 'a') as f:
-                f.write('\n# API Keys\n**/secrets.json\nsecrets.json\n')
+        _ensure_secrets_gitignored()
                 
         masked_key = f"{api_key[:4]}...{api_key[-2:]}" if len(api_key) > 6 else "***"
         print(f"{Fore.GREEN}API key saved ({masked_key}){Style.RESET_ALL}")
@@ -256,31 +606,55 @@ def get_api_key(model: str, base_dir: Path, logger: logging.Logger) -> str:
     return api_key
 
 
+def _scan_files(root: str) -> Iterator[os.DirEntry]:
+    """Recursively yield non-hidden files under root, using scandir's cached entry types"""
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                # Like rglob, don't descend into symlinked directories
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scan_files(entry.path)
+                elif entry.is_file():
+                    yield entry
+    except OSError:
+        return
+
+
+def _iter_supported_files(base_dir: Path) -> Iterator[Tuple[Path, os.DirEntry]]:
+    """Yield (path, scandir entry) for each file available for inclusion, unsorted"""
+    for search_path in _listing_roots(base_dir):
+        for entry in _scan_files(str(search_path)):
+            # One hash lookup on the name's extension (same rule as Path.suffix) is the whole
+            # filter, so rejected entries never become Path objects. Only the short suffix is
+            # case-folded; the full name only for the extensionless known-filename fallback
+            name = entry.name
+            dot = name.rfind('.')
+            if (dot > 0 and name[dot:].lower() in SUPPORTED_EXTENSIONS) or name.lower() in _KNOWN_FILENAMES:
+                yield Path(entry.path), entry
+
+
+def format_available_file(file_path: Path, size: Optional[int] = None) -> str:
+    """Describe an available file with its size and extension (stats it if size is not given)"""
+    if size is None:
+        size = file_path.stat().st_size
+    size_str = f"{size:,} bytes" if size < 1024*1024 else f"{size/(1024*1024):.1f} MB"
+    return f"{file_path} ({size_str}) [{file_path.suffix}]"
+
+
+def iter_available_filenames(base_dir: Path) -> Iterator[str]:
+    """Yield paths of available files as they are found, without stat()ing them"""
+    for file_path, _ in _iter_supported_files(base_dir):
+        yield str(file_path)
+
+
+def iter_available_files(base_dir: Path) -> Iterator[str]:
+    """Yield available files for inclusion, with sizes, as they are found (unsorted)"""
+    for file_path, entry in _iter_supported_files(base_dir):
+        yield format_available_file(file_path, entry.stat().st_size)
+
+
 def list_available_files(base_dir: Path) -> List[str]:
     """List available files for inclusion"""
-    files = []
-    search_paths = [
-        Path('.'),
-        Path('src'),
-        Path('lib'),
-        Path('scripts'),
-        Path('data'),
-        Path('documents'),
-        Path('files'),
-        Path('config'),
-        Path('configs'),
-        base_dir / 'uploads'
-    ]
-    
-    for search_path in search_paths:
-        if search_path.exists():
-            for file_path in search_path.rglob("*"):
-                if (file_path.is_file() and
-                    not file_path.name.startswith('.') and
-                    is_supported_file(file_path)):
-                    
-                    size = file_path.stat().st_size
-                    size_str = f"{size:,} bytes" if size < 1024*1024 else f"{size/(1024*1024):.1f} MB"
-                    files.append(f"{file_path} ({size_str}) [{file_path.suffix}]")
-                    
-    return sorted(files)
\ No newline at end of file
+    return sorted(iter_available_files(base_dir))